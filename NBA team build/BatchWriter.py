@@ -0,0 +1,62 @@
+import time
+
+
+def configure_connection(db, wal=False, synchronous=None):
+    """Opt-in write tuning for a sqlite3 connection.
+
+    `wal=True` switches the journal to write-ahead logging; `synchronous` sets
+    PRAGMA synchronous (e.g. "NORMAL" or "OFF"). Both are left alone by default.
+    """
+    if wal:
+        db.execute("PRAGMA journal_mode=WAL")
+    if synchronous is not None:
+        if str(synchronous).upper() not in ("OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3"):
+            raise ValueError(f"Invalid synchronous setting: {synchronous}")
+        db.execute(f"PRAGMA synchronous={synchronous}")
+
+
+class BatchWriter:
+    """Buffers rows and writes them with executemany, one transaction per flush.
+
+    Rows are grouped by SQL statement, so upserts for several tables can share a
+    batch. A flush happens once `batch_size` rows are buffered or
+    `flush_interval` seconds have passed since the last one.
+    """
+
+    def __init__(self, db, batch_size=500, flush_interval=5.0, clock=time.monotonic, metrics=None):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.clock = clock
+
+        self.pending = {}  # sql -> [rows]
+        self.pending_count = 0
+        self.last_flush = self.clock()
+        self.rows_written = 0
+        self.flush_seconds = 0.0
+        self.metrics = metrics  # optional MetricsRegistry
+
+    def add(self, sql, row):
+        self.pending.setdefault(sql, []).append(row)
+        self.pending_count += 1
+        if (self.pending_count >= self.batch_size
+                or self.clock() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write every buffered row in a single transaction."""
+        if self.pending_count:
+            start = time.perf_counter()
+            with self.db:
+                for sql, rows in self.pending.items():
+                    self.db.executemany(sql, rows)
+            elapsed = time.perf_counter() - start
+            self.flush_seconds += elapsed
+            self.rows_written += self.pending_count
+            if self.metrics is not None:
+                self.metrics.histogram('nba_db_flush_seconds', 'Duration of one batch write transaction').observe(elapsed)
+                self.metrics.counter('nba_db_rows_written_total', 'Rows written by the batch writer').inc(
+                    self.pending_count)
+            self.pending = {}
+            self.pending_count = 0
+        self.last_flush = self.clock()
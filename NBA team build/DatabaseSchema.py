@@ -0,0 +1,261 @@
+import logging
+import sqlite3
+from PlayerInfoParser import fold_name
+
+log = logging.getLogger(__name__)
+
+# Derives the typed Players columns from the display strings in one pass. Must
+# agree with PlayerInfoParser.typed_player_columns, which fills them at ingest.
+TYPED_PLAYER_BACKFILL = '''
+    UPDATE Players SET
+        height_in = CASE WHEN height GLOB '[0-9]*-[0-9]*' AND height NOT GLOB '*[^0-9-]*'
+                         THEN CAST(substr(height, 1, instr(height, '-') - 1) AS INTEGER) * 12
+                              + CAST(substr(height, instr(height, '-') + 1) AS INTEGER) END,
+        weight_lbs = CASE WHEN typeof(weight) = 'integer' THEN weight
+                          WHEN weight <> '' AND weight NOT GLOB '*[^0-9]*' THEN CAST(weight AS INTEGER) END,
+        jersey = CASE WHEN typeof(jersey_num) = 'integer' THEN jersey_num
+                      WHEN jersey_num <> '' AND jersey_num NOT GLOB '*[^0-9]*' THEN CAST(jersey_num AS INTEGER) END,
+        active = is_active = 'Active',
+        pos_mask = (instr(pos, 'Guard') > 0) + (instr(pos, 'Forward') > 0) * 2 + (instr(pos, 'Center') > 0) * 4;
+'''
+
+# fold_name() is registered as a SQL function on the connection before this runs
+FOLDED_NAME_BACKFILL = '''
+    UPDATE Players SET name_folded = fold_name(full_name);
+'''
+
+# Forward-only migrations. Entry N upgrades a DB from user_version N to N + 1,
+# so never edit a released entry -- append a new one instead.
+MIGRATIONS = [
+    # 1: base tables (IF NOT EXISTS so DBs built before versioning are adopted as-is)
+    '''
+    CREATE TABLE IF NOT EXISTS Teams (
+        team_id INTEGER PRIMARY KEY,
+        team_name TEXT,
+        team_ab TEXT,
+        team_nickname TEXT,
+        city TEXT,
+        state TEXT,
+        year_founded INTEGER
+    );
+    CREATE TABLE IF NOT EXISTS Players (
+        player_id INTEGER PRIMARY KEY,
+        full_name TEXT,
+        jersey_num INTEGER,
+        team_name TEXT,
+        team_ab TEXT,
+        pos TEXT,
+        height TEXT,
+        weight INTEGER,
+        country TEXT,
+        is_active TEXT
+    );
+    CREATE TABLE IF NOT EXISTS PlayerSync (
+        player_id INTEGER PRIMARY KEY,
+        last_fetched REAL NOT NULL,
+        active_at_fetch INTEGER NOT NULL
+    );
+    ''',
+    # 2: indexes for the PlayerDisplayApp filters and team lookups
+    '''
+    CREATE INDEX IF NOT EXISTS idx_players_team_ab ON Players (team_ab);
+    CREATE INDEX IF NOT EXISTS idx_players_pos ON Players (pos);
+    CREATE INDEX IF NOT EXISTS idx_players_country ON Players (country);
+    CREATE INDEX IF NOT EXISTS idx_players_is_active ON Players (is_active);
+    CREATE INDEX IF NOT EXISTS idx_players_full_name ON Players (full_name COLLATE NOCASE);
+    CREATE INDEX IF NOT EXISTS idx_teams_nickname ON Teams (team_nickname);
+    ''',
+    # 3: durable per-player job queue (replaces skipped_players.txt)
+    '''
+    CREATE TABLE IF NOT EXISTS PlayerJobs (
+        player_id INTEGER PRIMARY KEY,
+        state TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_retry_at REAL NOT NULL DEFAULT 0,
+        last_error TEXT,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_player_jobs_state_due ON PlayerJobs (state, next_retry_at);
+    ''',
+    # 4: league-wide season totals from LeagueDashPlayerStats
+    '''
+    CREATE TABLE IF NOT EXISTS PlayerSeasonStats (
+        player_id INTEGER NOT NULL,
+        season TEXT NOT NULL,
+        season_type TEXT NOT NULL DEFAULT 'Regular Season',
+        team_id INTEGER,
+        team_ab TEXT,
+        age REAL,
+        gp INTEGER,
+        w INTEGER,
+        l INTEGER,
+        min REAL,
+        pts INTEGER,
+        reb INTEGER,
+        oreb INTEGER,
+        dreb INTEGER,
+        ast INTEGER,
+        stl INTEGER,
+        blk INTEGER,
+        tov INTEGER,
+        pf INTEGER,
+        fgm INTEGER,
+        fga INTEGER,
+        fg_pct REAL,
+        fg3m INTEGER,
+        fg3a INTEGER,
+        fg3_pct REAL,
+        ftm INTEGER,
+        fta INTEGER,
+        ft_pct REAL,
+        plus_minus REAL,
+        fetched_at REAL NOT NULL,
+        PRIMARY KEY (player_id, season, season_type)
+    );
+    CREATE INDEX IF NOT EXISTS idx_season_stats_season ON PlayerSeasonStats (season, season_type);
+    ''',
+    # 5: typed copies of the display strings, for numeric range filters and sorts
+    '''
+    ALTER TABLE Players ADD COLUMN height_in INTEGER;
+    ALTER TABLE Players ADD COLUMN weight_lbs INTEGER;
+    ALTER TABLE Players ADD COLUMN jersey INTEGER;
+    ALTER TABLE Players ADD COLUMN active INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE Players ADD COLUMN pos_mask INTEGER NOT NULL DEFAULT 0;
+    ''' + TYPED_PLAYER_BACKFILL + '''
+    CREATE INDEX IF NOT EXISTS idx_players_height_in ON Players (height_in);
+    CREATE INDEX IF NOT EXISTS idx_players_weight_lbs ON Players (weight_lbs);
+    CREATE INDEX IF NOT EXISTS idx_players_jersey ON Players (jersey);
+    CREATE INDEX IF NOT EXISTS idx_players_active ON Players (active);
+    CREATE INDEX IF NOT EXISTS idx_players_pos_mask ON Players (pos_mask);
+    ''',
+    # 6: append-only player versions; existing rows become each player's first version
+    '''
+    CREATE TABLE IF NOT EXISTS PlayerHistory (
+        version_id INTEGER PRIMARY KEY,
+        player_id INTEGER NOT NULL,
+        valid_from REAL NOT NULL,
+        valid_to REAL,
+        content_hash TEXT,
+        full_name TEXT,
+        jersey_num INTEGER,
+        team_name TEXT,
+        team_ab TEXT,
+        pos TEXT,
+        height TEXT,
+        weight INTEGER,
+        country TEXT,
+        is_active TEXT
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_player_history_current ON PlayerHistory (player_id)
+        WHERE valid_to IS NULL;
+    CREATE INDEX IF NOT EXISTS idx_player_history_valid_from ON PlayerHistory (valid_from);
+    CREATE INDEX IF NOT EXISTS idx_player_history_player ON PlayerHistory (player_id, valid_from);
+    CREATE TRIGGER IF NOT EXISTS player_history_close BEFORE INSERT ON PlayerHistory
+    BEGIN
+        UPDATE PlayerHistory SET valid_to = NEW.valid_from
+        WHERE player_id = NEW.player_id AND valid_to IS NULL;
+    END;
+    CREATE VIEW IF NOT EXISTS PlayerCurrent AS
+        SELECT player_id, valid_from, content_hash, full_name, jersey_num, team_name, team_ab,
+               pos, height, weight, country, is_active
+        FROM PlayerHistory WHERE valid_to IS NULL;
+    INSERT INTO PlayerHistory (player_id, valid_from, full_name, jersey_num, team_name, team_ab,
+                               pos, height, weight, country, is_active)
+        SELECT p.player_id, COALESCE(s.last_fetched, 0), p.full_name, p.jersey_num, p.team_name,
+               p.team_ab, p.pos, p.height, p.weight, p.country, p.is_active
+        FROM Players p LEFT JOIN PlayerSync s ON s.player_id = p.player_id;
+    ''',
+    # 7: the rest of each CommonPlayerInfo payload (see PlayerInfoParser.DETAIL_FIELDS)
+    '''
+    CREATE TABLE IF NOT EXISTS PlayerDetails (
+        player_id INTEGER PRIMARY KEY,
+        first_name TEXT,
+        last_name TEXT,
+        display_first_last TEXT,
+        display_last_comma_first TEXT,
+        display_fi_last TEXT,
+        player_slug TEXT,
+        birthdate TEXT,
+        school TEXT,
+        country TEXT,
+        last_affiliation TEXT,
+        height TEXT,
+        weight TEXT,
+        season_exp INTEGER,
+        jersey TEXT,
+        position TEXT,
+        roster_status TEXT,
+        team_id INTEGER,
+        team_name TEXT,
+        team_abbreviation TEXT,
+        team_code TEXT,
+        team_city TEXT,
+        player_code TEXT,
+        from_year INTEGER,
+        to_year INTEGER,
+        dleague_flag TEXT,
+        nba_flag TEXT,
+        games_played_flag TEXT,
+        draft_year TEXT,
+        draft_round TEXT,
+        draft_number TEXT,
+        available_seasons TEXT,
+        extra TEXT,
+        fetched_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS PlayerHeadlineStats (
+        player_id INTEGER NOT NULL,
+        time_frame TEXT NOT NULL,
+        pts REAL,
+        ast REAL,
+        reb REAL,
+        pie REAL,
+        extra TEXT,
+        fetched_at REAL NOT NULL,
+        PRIMARY KEY (player_id, time_frame)
+    );
+    ''',
+    # 8: accent-folded names for PlayerQuery / NameIndex search (see PlayerInfoParser.fold_name)
+    '''
+    ALTER TABLE Players ADD COLUMN name_folded TEXT;
+    ''' + FOLDED_NAME_BACKFILL + '''
+    CREATE INDEX IF NOT EXISTS idx_players_name_folded ON Players (name_folded);
+    ''',
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _register_functions(db):
+    db.create_function('fold_name', 1, fold_name, deterministic=True)
+
+
+def backfill_typed_columns(db):
+    """Recompute the typed and folded-name Players columns, e.g. after rows were written without them."""
+    _register_functions(db)
+    with db:
+        db.execute(TYPED_PLAYER_BACKFILL)
+        db.execute(FOLDED_NAME_BACKFILL)
+
+
+def get_schema_version(db):
+    return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db):
+    """Bring `db` up to SCHEMA_VERSION. Each step runs in its own transaction."""
+    version = get_schema_version(db)
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema v{version} is newer than this code (v{SCHEMA_VERSION}).")
+
+    db.commit()
+    _register_functions(db)
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        try:
+            db.executescript(f"BEGIN;\n{MIGRATIONS[target - 1]}\nPRAGMA user_version = {target};\nCOMMIT;")
+        except sqlite3.Error:
+            if db.in_transaction:
+                db.rollback()
+            raise
+        log.info("Migrated database schema to v%d.", target)
+    return SCHEMA_VERSION
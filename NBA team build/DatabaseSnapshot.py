@@ -0,0 +1,152 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+from DatabaseSchema import backfill_typed_columns, get_schema_version, migrate
+from PlayerHistory import seed_versions
+
+log = logging.getLogger(__name__)
+
+# Columnar snapshots of the player DB for other tools. One file per table plus
+# a manifest; Arrow IPC files can be memory-mapped, Parquet ones are smaller.
+# pyarrow is only needed here, so it is imported lazily.
+
+SNAPSHOT_TABLES = ['Players', 'Teams', 'PlayerSync', 'PlayerSeasonStats', 'PlayerDetails',
+                   'PlayerHeadlineStats']
+FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+MANIFEST = 'manifest.json'
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("Snapshots need pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def _table_names(db):
+    return {name for (name,) in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def _column_array(pa, values):
+    """Arrow array for one SQLite column, typed by the values actually stored.
+
+    SQLite lets a column mix storage classes (an INTEGER column can hold ''),
+    so anything that is not purely numeric or binary becomes a string column.
+    Strings are dictionary-encoded; team, position and country repeat a lot.
+    """
+    kinds = {type(v) for v in values if v is not None}
+    if kinds <= {int}:
+        return pa.array(values, pa.int64())
+    if kinds <= {int, float}:
+        return pa.array(values, pa.float64())
+    if kinds == {bytes}:
+        return pa.array(values, pa.binary())
+    strings = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    return pa.array(strings, pa.string()).dictionary_encode()
+
+
+def read_table(db, name):
+    """A whole SQLite table as a pyarrow Table."""
+    pa = _pyarrow()
+    cursor = db.execute(f'SELECT * FROM "{name}"')
+    columns = [d[0] for d in cursor.description]
+    rows = cursor.fetchall()
+    arrays = [_column_array(pa, list(values)) for values in zip(*rows)] if rows else \
+             [pa.array([], pa.string()) for _ in columns]
+    return pa.Table.from_arrays(arrays, names=columns)
+
+
+def export_snapshot(db, directory, tables=None, fmt='arrow'):
+    """Write `tables` (default: SNAPSHOT_TABLES) to `directory`."""
+    pa = _pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown snapshot format {fmt!r}; use one of {sorted(FORMATS)}")
+    os.makedirs(directory, exist_ok=True)
+    existing = _table_names(db)
+    manifest = {'format': fmt, 'schema_version': get_schema_version(db),
+                'created_at': time.time(), 'tables': {}}
+
+    for name in tables or SNAPSHOT_TABLES:
+        if name not in existing:
+            continue
+        table = read_table(db, name)
+        path = os.path.join(directory, name + FORMATS[fmt])
+        if fmt == 'parquet':
+            pa.parquet.write_table(table, path)
+        else:
+            with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        manifest['tables'][name] = {'file': os.path.basename(path), 'rows': table.num_rows}
+        log.info("Exported %d rows of %s to %s", table.num_rows, name, path)
+
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_table(directory, entry, fmt):
+    """A snapshot table; Arrow IPC files are memory-mapped rather than read."""
+    pa = _pyarrow()
+    path = os.path.join(directory, entry['file'])
+    if fmt == 'parquet':
+        return pa.parquet.read_table(path)
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def import_snapshot(db, directory, replace=False):
+    """Bulk-load a snapshot into `db`, one transaction per table.
+
+    Rows are upserted by primary key; with `replace=True` each table is
+    emptied first so the DB matches the snapshot exactly. Imported players
+    that differ from their current PlayerHistory version get a new one.
+    """
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+    migrate(db)
+
+    for name, entry in manifest['tables'].items():
+        table = load_table(directory, entry, manifest['format'])
+        columns = ", ".join(f'"{c}"' for c in table.column_names)
+        sql = (f'INSERT OR REPLACE INTO "{name}" ({columns}) '
+               f'VALUES ({",".join("?" * table.num_columns)})')
+        with db:
+            if replace:
+                db.execute(f'DELETE FROM "{name}"')
+            for batch in table.to_batches():
+                db.executemany(sql, zip(*(column.to_pylist() for column in batch.columns)))
+        log.info("Imported %d rows into %s", table.num_rows, name)
+    if 'Players' in manifest['tables']:
+        backfill_typed_columns(db)  # older snapshots predate the typed columns
+        log.info("Opened %d player versions for the imported rows", seed_versions(db))
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import columnar snapshots of the player DB.")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("directory")
+    parser.add_argument("--db", default="nba_info.db")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="arrow")
+    parser.add_argument("--tables", nargs="+",
+                        help=f"tables to export (default: {' '.join(SNAPSHOT_TABLES)})")
+    parser.add_argument("--replace", action="store_true", help="empty each table before importing")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    db = sqlite3.connect(args.db)
+    if args.action == "export":
+        export_snapshot(db, args.directory, args.tables, args.format)
+    else:
+        import_snapshot(db, args.directory, args.replace)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
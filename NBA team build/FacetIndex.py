@@ -0,0 +1,130 @@
+from PlayerInfoParser import POSITION_BITS
+from NameIndex import NameIndex
+
+# Facet -> the PlayerQuery / filter keyword that selects it
+FACET_FILTERS = {'team': 'team', 'position': 'position', 'country': 'country', 'active': 'active_only'}
+
+
+def _bitset(positions, size):
+    buf = bytearray((size + 7) // 8)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, 'little')
+
+
+class FacetIndex:
+    """In-memory bitsets for the low-cardinality PlayerDisplayApp filters.
+
+    Bit i of a bitset (a plain Python int) stands for the i-th player in
+    player_id order. There is one bitset per team nickname, position token,
+    country and for active players, so a combined filter is a few ANDs, a
+    count is int.bit_count(), and a page walks only the set bits it shows.
+    The index is built once; the rows themselves stay in the DB. Names go
+    into a NameIndex keyed by bit position.
+    """
+
+    def __init__(self, ids, name_index, facets):
+        self.ids = ids  # bit position -> player_id
+        self.name_index = name_index
+        self.facets = facets  # facet -> value -> bitset
+        self.all = (1 << len(ids)) - 1
+
+    @classmethod
+    def from_db(cls, db):
+        nicknames = dict(db.execute("SELECT team_ab, team_nickname FROM Teams"))
+        ids, name_index = [], NameIndex()
+        members = {facet: {} for facet in FACET_FILTERS}
+        rows = db.execute("SELECT player_id, COALESCE(name_folded, full_name), team_ab, pos_mask, "
+                          "country, active FROM Players ORDER BY player_id")
+        for i, (player_id, name, team_ab, pos_mask, country, active) in enumerate(rows):
+            ids.append(player_id)
+            name_index.add(i, name)
+            if team_ab in nicknames:
+                members['team'].setdefault(nicknames[team_ab], []).append(i)
+            for position, bit in POSITION_BITS.items():
+                if (pos_mask or 0) & bit:
+                    members['position'].setdefault(position, []).append(i)
+            if country:
+                members['country'].setdefault(country, []).append(i)
+            if active:
+                members['active'].setdefault(True, []).append(i)
+        facets = {facet: {value: _bitset(positions, len(ids)) for value, positions in values.items()}
+                  for facet, values in members.items()}
+        name_index.by_length()  # sorted now, so the first one-letter search doesn't pay for it
+        return cls(ids, name_index, facets)
+
+    def search(self, name, candidates=None):
+        """Bit positions of the players matching `name`, best match first. With
+        `candidates` (the exact hits of a shorter name) only those are tested
+        for substring matches; typo matches still come from every player."""
+        return self.name_index.search(name, keys=candidates)
+
+    def bitset(self, positions):
+        return _bitset(positions, len(self.ids))
+
+    def select(self, positions, bits):
+        """The `positions` whose bit is set in `bits`, keeping their order."""
+        flags = bits.to_bytes(len(self.ids) // 8 + 1, 'little')
+        return [i for i in positions if flags[i >> 3] >> (i & 7) & 1]
+
+    def match(self, team=None, position=None, country=None, active_only=False, within=None):
+        """Bitset of players passing every facet filter. None / "All" means no filter."""
+        bits = self.all if within is None else within
+        for facet, value in (('team', team), ('position', position), ('country', country)):
+            if value and value != "All":
+                bits &= self.facets[facet].get(value, 0)
+        if active_only:
+            bits &= self.facets['active'].get(True, 0)
+        return bits
+
+    def filter(self, name, previous=None, **filters):
+        """One full filter pass: (name_ranking, name_exact, matches, ranking, facet counts).
+
+        name_ranking is every player matching `name` (None without a name),
+        name_exact its substring matches, matches the bitset passing all
+        filters, and ranking the matches in name-search order. `previous` is
+        the name_exact of a shorter name that `name` contains; substring
+        matches are then only looked for among those.
+        """
+        name_ranking = self.search(name, previous) if name else None
+        name_exact = self.name_index.exact_hits(name, name_ranking) if name else None
+        named = self.bitset(name_ranking) if name else None
+        matches = self.match(within=named, **filters)
+        if not name:
+            ranking = None
+        elif matches == named:
+            ranking = name_ranking
+        else:
+            ranking = self.select(name_ranking, matches)
+        return name_ranking, name_exact, matches, ranking, self.facet_counts(within=named, **filters)
+
+    def positions(self, bits, start=0, limit=None):
+        """Set bit positions of `bits` from `start` upward, lowest first."""
+        bits >>= start
+        found = 0
+        while bits and (limit is None or found < limit):
+            skip = (bits & -bits).bit_length()
+            start += skip
+            bits >>= skip
+            found += 1
+            yield start - 1
+
+    def player_ids(self, positions):
+        return [self.ids[i] for i in positions]
+
+    # -----------------------
+    # Counts
+    # -----------------------
+    def counts(self, facet, within=None):
+        """Matches per value of `facet` among `within` (every player by default)."""
+        within = self.all if within is None else within
+        return {value: (bits & within).bit_count() for value, bits in self.facets[facet].items()}
+
+    def facet_counts(self, within=None, **filters):
+        """Per-value counts for every facet under the other facets' filters.
+
+        A value's count is how many players selecting it would show, given
+        everything else currently filtered.
+        """
+        return {facet: self.counts(facet, self.match(within=within, **dict(filters, **{key: None})))
+                for facet, key in FACET_FILTERS.items()}
@@ -2,24 +2,31 @@ import tkinter as tk
 from tkinter import ttk
 
 class FilterSection:
+    search_delay_ms = 150  # typing pause before the name filter runs
+
     def __init__(self, app, root):
         self.app = app
         self.frame = ttk.Frame(root)
         self.frame.pack(pady=10)
 
         self.filters = {}
+        self.dropdowns = {}  # facet -> (var, combobox, values)
+        self.labels = {}  # facet -> shown label -> value
+        self._pending = None  # `after` id of the scheduled name search
 
         # Create filters
         self.name_entry = self._add_entry("Name:", 0)
-        self.team_var = self._add_dropdown("Team:", 2, ["All"] + sorted(set(team[3] for team in app.collector.get_team_info_db())))
-        self.position_var = self._add_dropdown("Position:", 4, ["All", "Guard", "Center", "Forward"])
-        self.country_var = self._add_dropdown("Country:", 6, ["All"] + sorted(set(player[8] for player in app.original_player_list if player[8])))
+        self.name_entry.bind("<KeyRelease>", self._schedule_filter)
+        self.team_var = self._add_dropdown("Team:", 2, ["All"] + app.metadata.teams, 'team')
+        self.position_var = self._add_dropdown("Position:", 4, ["All"] + app.metadata.positions, 'position')
+        self.country_var = self._add_dropdown("Country:", 6, ["All"] + app.metadata.countries, 'country')
         self.active_var = tk.BooleanVar()
-        self.active_checkbox = ttk.Checkbutton(self.frame, text="Active Only", variable=self.active_var)
+        self.active_checkbox = ttk.Checkbutton(self.frame, text="Active Only", variable=self.active_var,
+                                               command=self._apply_filter)
         self.active_checkbox.grid(row=0, column=8, padx=5, pady=5)
 
         # Filter button
-        self.filter_button = ttk.Button(self.frame, text="Filter", command=self._apply_filter)
+        self.filter_button = ttk.Button(self.frame, text="Filter", command=lambda: self._apply_filter(force=True))
         self.filter_button.grid(row=0, column=9, padx=5, pady=5)
 
     def _add_entry(self, label_text, col):
@@ -28,20 +35,45 @@ class FilterSection:
         entry.grid(row=0, column=col + 1, padx=5, pady=5)
         return entry
 
-    def _add_dropdown(self, label_text, col, values):
+    def _add_dropdown(self, label_text, col, values, facet):
         ttk.Label(self.frame, text=label_text).grid(row=0, column=col, padx=5, pady=5)
         var = tk.StringVar()
         dropdown = ttk.Combobox(self.frame, textvariable=var, values=values, state="readonly")
         dropdown.grid(row=0, column=col + 1, padx=5, pady=5)
         dropdown.current(0)
+        dropdown.bind("<<ComboboxSelected>>", lambda event: self._apply_filter())
+        self.dropdowns[facet] = (var, dropdown, values)
         return var
 
-    def _apply_filter(self):
+    def _selected(self, facet):
+        var = self.dropdowns[facet][0]
+        return self.labels.get(facet, {}).get(var.get(), var.get())
+
+    def update_counts(self, counts):
+        """Show next to each dropdown value how many players it would match."""
+        for facet, (var, dropdown, values) in self.dropdowns.items():
+            current = self._selected(facet)
+            labels = ["All"] + [f"{value} ({counts[facet].get(value, 0)})" for value in values[1:]]
+            self.labels[facet] = dict(zip(labels, values))
+            dropdown['values'] = labels
+            var.set(labels[values.index(current)])
+        self.active_checkbox['text'] = f"Active Only ({counts['active'].get(True, 0)})"
+
+    def _schedule_filter(self, event=None):
+        """Filter once typing pauses; each keystroke cancels the search still pending."""
+        if self._pending is not None:
+            self.frame.after_cancel(self._pending)
+        self._pending = self.frame.after(self.search_delay_ms, self._apply_filter)
+
+    def _apply_filter(self, force=False):
+        if self._pending is not None:
+            self.frame.after_cancel(self._pending)
+            self._pending = None
         self.filters = {
-            'name': self.name_entry.get(),
-            'team': self.team_var.get(),
-            'position': self.position_var.get(),
-            'country': self.country_var.get(),
-            'active': self.active_var.get()
+            'name': self.name_entry.get().strip(),
+            'team': self._selected('team'),
+            'position': self._selected('position'),
+            'country': self._selected('country'),
+            'active_only': self.active_var.get()
         }
-        self.app.apply_filter()
+        self.app.apply_filter(force)
@@ -0,0 +1,158 @@
+import itertools
+import logging
+import queue
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+_STOP = object()
+_END = object()
+
+
+class StageStats:
+    """Throughput counters for one pipeline stage (summed over its workers)."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0      # seconds spent doing the stage's work
+        self.starved = 0.0   # seconds waiting for input
+        self.blocked = 0.0   # seconds waiting for room downstream (backpressure)
+        self.lock = threading.Lock()
+
+    def add(self, busy=0.0, starved=0.0, blocked=0.0, items=0):
+        with self.lock:
+            self.items += items
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+
+    def summary(self, wall):
+        capacity = max(wall * self.workers, 1e-9)
+        rate = self.items / self.busy if self.busy else 0.0
+        return (f"{self.name:<10} x{self.workers:<3} {self.items:>7,} items  "
+                f"{rate * self.workers:>10,.1f}/s capacity  "
+                f"busy {self.busy / capacity:>4.0%}  starved {self.starved / capacity:>4.0%}  "
+                f"blocked {self.blocked / capacity:>4.0%}")
+
+
+class Stage:
+    def __init__(self, name, func, workers, buffer_size):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.inbox = queue.Queue(maxsize=buffer_size)
+        self.stats = StageStats(name, workers)
+        self.remaining = workers
+        self.lock = threading.Lock()
+
+
+class IngestPipeline:
+    """Streaming source -> stages -> sink pipeline over bounded queues.
+
+    Worker stages run on threads; `func(item)` returns the item for the next
+    stage (or None to drop it). The source is pulled and the sink is called on
+    the thread that runs `run`, so both may use that thread's sqlite3
+    connection. Bounded buffers give backpressure: the source is only pulled
+    when the first stage has room, so memory stays flat however long the
+    source is.
+    """
+
+    def __init__(self, buffer_size=64):
+        self.buffer_size = buffer_size
+        self.stages = []
+        self.source_stats = StageStats('source', 1)
+        self.sink_stats = StageStats('write', 1)
+        self.wall = 0.0
+
+    def add_stage(self, name, func, workers=1):
+        self.stages.append(Stage(name, func, workers, self.buffer_size))
+        return self
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        outbox = self.stages[index + 1].inbox if index + 1 < len(self.stages) else self.output
+        while True:
+            start = time.perf_counter()
+            item = stage.inbox.get()
+            got = time.perf_counter()
+            if item is _STOP:
+                stage.stats.add(starved=got - start)
+                with stage.lock:
+                    stage.remaining -= 1
+                    last = stage.remaining == 0
+                if last:  # last worker out tells the next stage
+                    for _ in range(self.stages[index + 1].workers if index + 1 < len(self.stages) else 1):
+                        outbox.put(_STOP)
+                return
+            try:
+                result = stage.func(item)
+            except Exception as e:  # a dead worker would stall the whole pipeline
+                log.warning("Pipeline stage %s dropped an item: %s", stage.name, e)
+                result = None
+            done = time.perf_counter()
+            if result is not None:
+                outbox.put(result)
+            stage.stats.add(busy=done - got, starved=got - start,
+                            blocked=time.perf_counter() - done, items=1)
+
+    def run(self, source, sink):
+        """Push every item of `source` through the stages into `sink`."""
+        self.output = queue.Queue(maxsize=self.buffer_size)
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                thread = threading.Thread(target=self._worker, args=(index,), daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        first = self.stages[0].inbox
+        # Never block on the first stage here: this thread also drains the output
+        source = itertools.chain(source, [_STOP] * self.stages[0].workers)
+        source_done = False
+        pending = None
+        started = time.perf_counter()
+        while True:
+            # Top up the first stage while it has room
+            while not source_done:
+                start = time.perf_counter()
+                if pending is None:
+                    pending = next(source, _END)
+                    if pending is _END:
+                        pending = None
+                        source_done = True
+                        break
+                try:
+                    first.put_nowait(pending)
+                except queue.Full:
+                    break
+                if pending is not _STOP:
+                    self.source_stats.add(busy=time.perf_counter() - start, items=1)
+                pending = None
+
+            # Drain finished items into the sink
+            start = time.perf_counter()
+            try:
+                item = self.output.get(timeout=0.01 if not source_done else 0.1)
+            except queue.Empty:
+                self.sink_stats.add(starved=time.perf_counter() - start)
+                continue
+            got = time.perf_counter()
+            self.sink_stats.add(starved=got - start)
+            if item is _STOP:
+                break
+            sink(item)
+            self.sink_stats.add(busy=time.perf_counter() - got, items=1)
+
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - started
+        return self
+
+    def report(self):
+        lines = [f"Pipeline: {self.wall:.2f}s wall"]
+        for stats in [self.source_stats] + [s.stats for s in self.stages] + [self.sink_stats]:
+            lines.append("  " + stats.summary(self.wall))
+        return "\n".join(lines)
@@ -1,3 +1,4 @@
+import logging
 import tkinter as tk
 from PlayerDisplayApp import PlayerDisplayApp
 
@@ -12,5 +13,6 @@ class Main:
         self.root.mainloop()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     main_program = Main()  # Create the Main instance
     main_program.run()  # Start the app by running the Tkinter event loop
@@ -0,0 +1,34 @@
+class MetadataCache:
+    """Filter dropdown values -- team nicknames, countries, positions -- read
+    from the DB once and shared by PlayerDisplayApp and FilterSection."""
+
+    def __init__(self, query):
+        self.query = query
+        self.values = {}
+
+    def _cached(self, key, load):
+        if key not in self.values:
+            self.values[key] = load()
+        return self.values[key]
+
+    @property
+    def teams(self):
+        return self._cached('teams', self.query.team_nicknames)
+
+    @property
+    def countries(self):
+        return self._cached('countries', self.query.countries)
+
+    @property
+    def positions(self):
+        return self._cached('positions', self.query.positions)
+
+    def load(self):
+        """Read every value now rather than on first use."""
+        for name in ('teams', 'countries', 'positions'):
+            getattr(self, name)
+        return self
+
+    def clear(self):
+        """Forget the values, e.g. after an ingestion run changed the DB."""
+        self.values.clear()
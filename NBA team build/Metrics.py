@@ -0,0 +1,217 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; covers API round trips as well as DB flushes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class _CounterValue:
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def set(self, value):
+        with self.lock:
+            self.value = value
+
+
+class _HistogramValue:
+    """Bucket counts for Prometheus plus a bounded sample for percentiles."""
+
+    max_samples = 10000
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = []
+        self.rng = random.Random(0)
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        with self.lock:
+            self.count += 1
+            self.sum += value
+            self.max = max(self.max, value)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+            if len(self.samples) < self.max_samples:
+                self.samples.append(value)
+            else:  # reservoir sampling keeps percentiles honest on long runs
+                slot = self.rng.randrange(self.count)
+                if slot < self.max_samples:
+                    self.samples[slot] = value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def quantile(self, q):
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def summary(self):
+        return {'count': self.count, 'sum': round(self.sum, 6),
+                'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+                'p50': round(self.quantile(0.5), 6), 'p90': round(self.quantile(0.9), 6),
+                'p99': round(self.quantile(0.99), 6), 'max': round(self.max, 6)}
+
+
+class Metric:
+    """A named counter, gauge or histogram, optionally split by labels."""
+
+    def __init__(self, kind, name, help='', labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.children = {}  # label values -> value object
+        self.lock = threading.Lock()
+
+    def labels(self, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.get(key)
+                if child is None:
+                    child = _HistogramValue(self.buckets) if self.kind == 'histogram' else _CounterValue()
+                    self.children[key] = child
+        return child
+
+    # Unlabelled shortcuts
+    def inc(self, amount=1, **labels):
+        self.labels(**labels).inc(amount)
+
+    def set(self, value, **labels):
+        self.labels(**labels).set(value)
+
+    def observe(self, value, **labels):
+        self.labels(**labels).observe(value)
+
+    def time(self, **labels):
+        return self.labels(**labels).time()
+
+    def total(self):
+        """Sum over all label values (count of observations for histograms)."""
+        if self.kind == 'histogram':
+            return sum(child.count for child in self.children.values())
+        return sum(child.value for child in self.children.values())
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+    def prometheus_lines(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, child in sorted(self.children.items()):
+            if self.kind != 'histogram':
+                lines.append(f"{self.name}{self._label_text(key)} {child.value:g}")
+                continue
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{self._label_text(key, [('le', f'{bound:g}')])} {cumulative}")
+            lines.append(f"{self.name}_bucket{self._label_text(key, [('le', '+Inf')])} {child.count}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {child.sum:g}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {child.count}")
+        return lines
+
+    def report(self):
+        values = {}
+        for key, child in sorted(self.children.items()):
+            label = ','.join(f"{k}={v}" for k, v in zip(self.labelnames, key)) or 'value'
+            values[label] = child.summary() if self.kind == 'histogram' else child.value
+        return values
+
+
+class MetricsRegistry:
+    """The counters, gauges and histograms of one ingestion run.
+
+    Metrics are created on first use and shared by name, so each component can
+    ask for the ones it updates. Exports go to a Prometheus textfile (for
+    node_exporter's textfile collector) and a JSON run report.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def _metric(self, kind, name, help, labelnames, buckets=DEFAULT_BUCKETS):
+        metric = self.metrics.get(name)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.get(name)
+                if metric is None:
+                    metric = self.metrics[name] = Metric(kind, name, help, labelnames, buckets)
+        return metric
+
+    def counter(self, name, help='', labelnames=()):
+        return self._metric('counter', name, help, labelnames)
+
+    def gauge(self, name, help='', labelnames=()):
+        return self._metric('gauge', name, help, labelnames)
+
+    def histogram(self, name, help='', labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._metric('histogram', name, help, labelnames, buckets)
+
+    def to_prometheus(self):
+        lines = []
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].prometheus_lines())
+        return "\n".join(lines) + "\n"
+
+    def report(self):
+        return {'started_at': self.started, 'elapsed_seconds': round(time.time() - self.started, 3),
+                'metrics': {name: self.metrics[name].report() for name in sorted(self.metrics)}}
+
+    def write_prometheus(self, path):
+        _write_atomic(path, self.to_prometheus())
+
+    def write_json(self, path):
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+
+    def summary(self):
+        """One line per metric, for the end-of-run log."""
+        lines = []
+        for name in sorted(self.metrics):
+            metric = self.metrics[name]
+            for label, value in metric.report().items():
+                label = '' if label == 'value' else f"{{{label}}}"
+                if metric.kind == 'histogram':
+                    lines.append(f"  {name}{label}: n={value['count']} p50={value['p50']:.4f}s "
+                                 f"p90={value['p90']:.4f}s p99={value['p99']:.4f}s max={value['max']:.4f}s")
+                else:
+                    lines.append(f"  {name}{label}: {value:,.6g}")
+        return "\n".join(lines)
+
+
+def _write_atomic(path, text):
+    # A scraper must never see a half-written file
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
@@ -1,98 +1,260 @@
-import os
+import argparse
+import json
+import logging
 import time
-import random
 import sqlite3
 from nba_api.stats.static import players, teams
-from nba_api.stats.endpoints import CommonPlayerInfo
-from requests.exceptions import ReadTimeout, ConnectionError
+from nba_api.stats.library.parameters import Season
+from RateLimiter import TokenBucket
+from BatchWriter import BatchWriter, configure_connection
+from DatabaseSchema import migrate
+from RosterIndex import RosterIndex
+from ResponseCache import ResponseCache
+from RetryPolicy import RetryPolicy, PERMANENT, PARSE, BUDGET
+from IngestPipeline import IngestPipeline
+from StatsClient import request_common_player_info, request_team_roster
+from PlayerInfoParser import (parse_player_info, parse_player_details, parse_team_roster,
+                              typed_player_columns, fold_name, DETAIL_FIELDS, HEADLINE_FIELDS)
+from WorkQueue import WorkQueue, PENDING, IN_FLIGHT, FAILED, DEAD
+from ShardManifest import ShardManifest, in_shard
+from SessionProvider import SessionProvider
+from Metrics import MetricsRegistry
+from PlayerHistory import PlayerHistory
+
+log = logging.getLogger(__name__)
+
+
+PLAYER_UPSERT = '''
+    INSERT INTO Players (
+        player_id, full_name, jersey_num, team_name, team_ab,
+        pos, height, weight, country, is_active,
+        height_in, weight_lbs, jersey, active, pos_mask, name_folded
+    )
+    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(player_id) DO UPDATE SET
+        full_name = excluded.full_name, jersey_num = excluded.jersey_num,
+        team_name = excluded.team_name, team_ab = excluded.team_ab,
+        pos = excluded.pos, height = excluded.height, weight = excluded.weight,
+        country = excluded.country, is_active = excluded.is_active,
+        height_in = excluded.height_in, weight_lbs = excluded.weight_lbs,
+        jersey = excluded.jersey, active = excluded.active, pos_mask = excluded.pos_mask,
+        name_folded = excluded.name_folded
+'''
+
+# Roster rows carry no country, so an earlier per-player value is kept
+ROSTER_PLAYER_UPSERT = '''
+    INSERT INTO Players (
+        player_id, full_name, jersey_num, team_name, team_ab,
+        pos, height, weight, is_active,
+        height_in, weight_lbs, jersey, active, pos_mask, name_folded
+    )
+    VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+    ON CONFLICT(player_id) DO UPDATE SET
+        full_name = excluded.full_name, jersey_num = excluded.jersey_num,
+        team_name = excluded.team_name, team_ab = excluded.team_ab,
+        pos = excluded.pos, height = excluded.height, weight = excluded.weight,
+        is_active = excluded.is_active,
+        height_in = excluded.height_in, weight_lbs = excluded.weight_lbs,
+        jersey = excluded.jersey, active = excluded.active, pos_mask = excluded.pos_mask,
+        name_folded = excluded.name_folded
+'''
+
+TEAM_UPSERT = '''
+    INSERT INTO Teams (
+        team_id, team_name, team_ab, team_nickname,
+        city, state, year_founded
+    )
+    VALUES (?,?,?,?,?,?,?)
+    ON CONFLICT(team_id) DO UPDATE SET
+        team_name = excluded.team_name, team_ab = excluded.team_ab,
+        team_nickname = excluded.team_nickname, city = excluded.city,
+        state = excluded.state, year_founded = excluded.year_founded
+'''
+
+_DETAIL_COLUMNS = ['player_id', *DETAIL_FIELDS.values(), 'available_seasons', 'extra', 'fetched_at']
+DETAILS_UPSERT = f'''
+    INSERT INTO PlayerDetails ({", ".join(_DETAIL_COLUMNS)})
+    VALUES ({",".join("?" * len(_DETAIL_COLUMNS))})
+    ON CONFLICT(player_id) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in _DETAIL_COLUMNS[1:])}
+'''
+
+_HEADLINE_COLUMNS = ['player_id', *HEADLINE_FIELDS.values(), 'extra', 'fetched_at']
+HEADLINE_UPSERT = f'''
+    INSERT INTO PlayerHeadlineStats ({", ".join(_HEADLINE_COLUMNS)})
+    VALUES ({",".join("?" * len(_HEADLINE_COLUMNS))})
+    ON CONFLICT(player_id, time_frame) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in _HEADLINE_COLUMNS[2:])}
+'''
+
+SYNC_UPSERT = '''
+    INSERT INTO PlayerSync (player_id, last_fetched, active_at_fetch)
+    VALUES (?,?,?)
+    ON CONFLICT(player_id) DO UPDATE SET
+        last_fetched = excluded.last_fetched,
+        active_at_fetch = excluded.active_at_fetch
+'''
 
 
 class NBADataCollector:
-    def __init__(self, db_name='nba_info.db', skipped_file="skipped_players.txt"):
+    def __init__(self, db_name='nba_info.db', skipped_file="skipped_players.txt",
+                 workers=1, requests_per_second=2.0, endpoint=request_common_player_info,
+                 batch_size=500, flush_interval=5.0, wal=False, synchronous=None,
+                 cache=None, retry_policy=None, buffer_size=64, shard=None, sessions=None,
+                 metrics=None):
         # Database
         self.db_name = db_name
         self.db = sqlite3.connect(self.db_name)
         self.cursor = self.db.cursor()
+        configure_connection(self.db, wal=wal, synchronous=synchronous)
+        migrate(self.db)
+        self.metrics = metrics or MetricsRegistry()  # counters/histograms for this run
+        self.writer = BatchWriter(self.db, batch_size, flush_interval, metrics=self.metrics)
 
         # Player/team storage
-        self.player_table = []
+        self.roster = RosterIndex()  # player_id -> static metadata, built once per run
         self.team_table = []
-
-        # Retry/skipped player tracking
+        self.shard = shard  # (index, count): only collect player_id % count == index
+        self.history = PlayerHistory(self.db, self.writer)  # versions; skips unchanged rows
+
+        # Shared retry rules (backoff, circuit breaker, time budget)
+        self.retry_policy = retry_policy or RetryPolicy()
+        if self.retry_policy.metrics is None:
+            self.retry_policy.metrics = self.metrics
+
+        # Durable job queue; a legacy skipped_players.txt is folded in once
+        self.queue = WorkQueue(self.db, self.writer)
+        recovered = self.queue.recover()
+        if recovered:
+            log.info("Recovered %d in-flight players from an interrupted run.", recovered)
         self.skipped_file = skipped_file
-        self.skipped_players = set(self._load_skipped_players())
+        self.queue.import_skipped_file(self.skipped_file)
+
+        # Fetch engine: `endpoint` is swappable so a stub can stand in for the API.
+        # It is called as endpoint(player_id=..., timeout=...) and may return the
+        # payload dict or an nba_api endpoint object (e.g. CommonPlayerInfo).
+        self.workers = workers
+        self.endpoint = endpoint
+        self.rate_limiter = TokenBucket(requests_per_second, capacity=workers)
+        self.sessions = sessions or SessionProvider(pool_size=workers).install()  # keep-alive pool, one slot per worker
+        self.cache = cache  # optional ResponseCache for raw API payloads
+        self.buffer_size = buffer_size  # per-stage pipeline buffer
+        self.roster_season = Season.default  # season for CommonTeamRoster calls
+        self.last_pipeline = None
 
     # -----------------------
     # Skipped player handling
     # -----------------------
-    def _load_skipped_players(self):
-        if os.path.exists(self.skipped_file):
-            with open(self.skipped_file, "r") as f:
-                return [int(line.strip()) for line in f if line.strip().isdigit()]
-        return []
+    @property
+    def skipped_players(self):
+        """IDs waiting for a retry."""
+        return set(self.queue.ids(FAILED))
 
-    def _save_skipped_players(self):
-        if self.skipped_players:
-            with open(self.skipped_file, "w") as f:
-                for pid in sorted(self.skipped_players):
-                    f.write(f"{pid}\n")
-        elif os.path.exists(self.skipped_file):
-            os.remove(self.skipped_file)
+    def _count_player(self, result):
+        self.metrics.counter('nba_players_total', 'Players processed, by result', ('result',)).inc(result=result)
 
     def _mark_player_success(self, player_id):
-        if player_id in self.skipped_players:
-            self.skipped_players.remove(player_id)
-            self._save_skipped_players()
+        self.queue.mark_done(player_id)
+        self._count_player('stored')
+
+    def _mark_player_failed(self, player_id, error=None, error_class=None):
+        if error_class == BUDGET:
+            self.queue.release(player_id)  # never attempted; leave it for the next run
+            self._count_player('deferred')
+        elif error_class == PERMANENT:
+            self.queue.mark_dead(player_id, error)
+            self._count_player('dead')
+        else:
+            self.queue.mark_failed(player_id, error)
+            self._count_player('failed')
 
-    def _mark_player_failed(self, player_id):
-        self.skipped_players.add(player_id)
-        self._save_skipped_players()
+    # -----------------------
+    # Sync state (delta runs)
+    # -----------------------
+    def _record_sync(self, player_id, is_active):
+        self.writer.add(SYNC_UPSERT, (player_id, time.time(), int(is_active == 'Active')))
+
+    def select_players_to_sync(self, staleness_days=7, now=None):
+        """Return the player IDs a delta run has to fetch.
+
+        That is new players, players whose static active flag changed since
+        their last fetch, and active players not fetched within `staleness_days`.
+        Rows collected before sync state existed fall back to their stored
+        `is_active` value with a last fetch time of 0.
+        """
+        cutoff = (now or time.time()) - staleness_days * 86400
+        self.writer.flush()
+
+        self.cursor.execute('''
+            SELECT p.player_id,
+                   COALESCE(s.last_fetched, 0),
+                   COALESCE(s.active_at_fetch, p.is_active = 'Active')
+            FROM Players p LEFT JOIN PlayerSync s ON s.player_id = p.player_id
+        ''')
+        state = {pid: (last_fetched, bool(was_active))
+                 for pid, last_fetched, was_active in self.cursor.fetchall()}
+
+        to_fetch = []
+        for pid, status in self.roster.statuses():
+            is_active = status == 'Active'
+            if not in_shard(pid, self.shard):
+                continue
+            if pid not in state:
+                to_fetch.append(pid)  # new player
+                continue
+            last_fetched, was_active = state[pid]
+            if is_active != was_active:
+                to_fetch.append(pid)  # active flag changed
+            elif is_active and last_fetched < cutoff:
+                to_fetch.append(pid)  # stale active player
+        return to_fetch
 
     # -----------------------
     # Database checks/inserts
     # -----------------------
     def player_exists(self, player_id):
+        self.writer.flush()
         self.cursor.execute("SELECT COUNT(*) FROM Players WHERE player_id = ?", (player_id,))
         return self.cursor.fetchone()[0] > 0
 
     def team_exists(self, team_id):
+        self.writer.flush()
         self.cursor.execute("SELECT COUNT(*) FROM Teams WHERE team_id = ?", (team_id,))
         return self.cursor.fetchone()[0] > 0
 
     def add_player_to_db(self, player_id, player_name, player_num, team_name, team_ab,
                          position, height, weight, country, is_active):
-        if not self.player_exists(player_id):
-            insert = '''
-                INSERT INTO Players (
-                    player_id, full_name, jersey_num, team_name, team_ab,
-                    pos, height, weight, country, is_active
-                )
-                VALUES (?,?,?,?,?,?,?,?,?,?)
-            '''
-            try:
-                self.cursor.execute(insert, [
-                    player_id, player_name, player_num, team_name, team_ab,
-                    position, height, weight, country, is_active
-                ])
-                self.db.commit()
-            except sqlite3.IntegrityError:
-                pass
+        """Queue a player upsert and a new history version; rows reach the DB when
+        the writer flushes. An unchanged record writes nothing. Returns True if it changed."""
+        if not self.history.record(player_id, (player_name, player_num, team_name, team_ab,
+                                               position, height, weight, country, is_active)):
+            self.metrics.counter('nba_players_unchanged_total', 'Fetched players identical to the stored version').inc()
+            return False
+        self.writer.add(PLAYER_UPSERT, (
+            player_id, player_name, player_num, team_name, team_ab,
+            position, height, weight, country, is_active,
+            *typed_player_columns(player_num, position, height, weight, is_active),
+            fold_name(player_name)
+        ))
+        return True
+
+    def add_player_details(self, player_id, details, now=None):
+        """Queue the full CommonPlayerInfo record and its headline stats, in the same batch
+        as the player row."""
+        now = now or time.time()
+        self.writer.add(DETAILS_UPSERT, (
+            player_id, *details['info'].values(), json.dumps(details['available_seasons']),
+            json.dumps(details['info_extra']) if details['info_extra'] else None, now))
+        for columns, extra in details['headlines']:
+            if columns['time_frame'] is None:
+                continue
+            self.writer.add(HEADLINE_UPSERT, (player_id, *columns.values(),
+                                              json.dumps(extra) if extra else None, now))
 
     def add_teams_to_db(self):
         for team in self.team_table:
-            if not self.team_exists(team[0]):
-                insert = '''
-                    INSERT INTO Teams (
-                        team_id, team_name, team_ab, team_nickname,
-                        city, state, year_founded
-                    )
-                    VALUES (?,?,?,?,?,?,?)
-                '''
-                try:
-                    self.cursor.execute(insert, team)
-                    self.db.commit()
-                except sqlite3.IntegrityError:
-                    pass
+            self.writer.add(TEAM_UPSERT, tuple(team))
+        self.writer.flush()
 
     # -----------------------
     # API data retrieval
@@ -104,96 +266,416 @@ class NBADataCollector:
         return teams.get_teams()
 
     def get_player_id_api(self):
-        return [player[0] for player in self.player_table]
-
-    def fetch_and_save_player(self, player_id, max_retries=3, retry_delay_range=(2, 5)):
+        return [pid for pid in self.roster if in_shard(pid, self.shard)]
+
+    def _rate_limit(self):
+        waited = self.rate_limiter.acquire()  # shared across workers to prevent rate limit
+        if waited:
+            self.metrics.counter('nba_rate_limit_wait_seconds_total',
+                                 'Time workers spent waiting on the request rate limit').inc(waited)
+
+    def _api_timer(self, endpoint):
+        return self.metrics.histogram('nba_api_request_seconds', 'Stats API round-trip time',
+                                      ('endpoint',)).time(endpoint=endpoint)
+
+    def _request_player_info(self, player_id):
+        """Raw CommonPlayerInfo payload, served from the response cache when possible."""
+        def load():
+            self._rate_limit()
+            with self._api_timer('commonplayerinfo'):
+                response = self.endpoint(player_id=player_id, timeout=60)
+            return response if isinstance(response, dict) else response.get_dict()
+
+        if self.cache is None:
+            return load()
+        return self.cache.fetch('commonplayerinfo', {'PlayerID': player_id}, load, parse_player_info)
+
+    def _parse_player(self, player_id, payload):
+        record = parse_player_info(payload)
+        return [player_id, record['full_name'], record['jersey_num'], record['team_name'],
+                record['team_ab'], record['pos'], record['height'], record['weight'],
+                record['country'], self.roster.status(player_id)]
+
+    def _parse_payload(self, player_id, payload):
+        """(row for add_player_to_db, details for add_player_details) from one payload."""
+        return self._parse_player(player_id, payload), parse_player_details(payload)
+
+    def fetch_player(self, player_id):
+        """Fetch a single player's info from the API, retrying per `retry_policy`.
+
+        Only touches the network, so it is safe to run on worker threads.
+        Returns the row for `add_player_to_db`, or None if every attempt failed.
+        """
+        return self._fetch_player_result(player_id)[0]
+
+    def _fetch_player_result(self, player_id):
+        """Like `fetch_player`, but returns (row, error class, error message, details)."""
+        log.debug("Fetching info for player ID: %s", player_id)
+        parsed, error_class, error = self.retry_policy.call(
+            lambda: self._parse_payload(player_id, self._request_player_info(player_id)))
+        if parsed is None:
+            if error_class != BUDGET:
+                log.warning("Skipping player %s (%s): %s", player_id, error_class, error)
+            return None, error_class, error, None
+        return parsed[0], error_class, error, parsed[1]
+
+    def save_player(self, player_id, row, error_class=None, error=None, details=None):
+        """Write a fetched row (and the rest of its payload) and update the job queue.
+        Must run on the DB thread."""
+        if row is None:
+            self._mark_player_failed(player_id, error, error_class)
+            return False
+
+        self.add_player_to_db(*row)
+        if details is not None:
+            self.add_player_details(player_id, details)
+        self._record_sync(player_id, row[-1])
+        self._mark_player_success(player_id)
+        return True
+
+    def fetch_and_save_player(self, player_id):
         """Fetch a single player's info and save to DB, with retry."""
-        for attempt in range(1, max_retries + 1):
-            print(f"Fetching info for player ID: {player_id} (Attempt {attempt})")
+        return self.save_player(player_id, *self._fetch_player_result(player_id))
+
+    # -----------------------
+    # Streaming pipeline stages
+    # -----------------------
+    def _fetch_stage(self, item):
+        player_id = item['player_id']
+        log.debug("Fetching info for player ID: %s", player_id)
+        payload, item['error_class'], item['error'] = self.retry_policy.call(
+            self._request_player_info, player_id)
+        item['payload'] = payload
+        return item
+
+    def _parse_stage(self, item):
+        if item['payload'] is not None:
             try:
-                player_info = CommonPlayerInfo(player_id=player_id, timeout=60)
-                df = player_info.get_data_frames()[0]
-
-                player_name = df.at[0, 'DISPLAY_FIRST_LAST']
-                player_num = df.at[0, 'JERSEY']
-                team_name = df.at[0, 'TEAM_NAME']
-                team_ab = df.at[0, 'TEAM_ABBREVIATION']
-                position = df.at[0, 'POSITION']
-                height = df.at[0, 'HEIGHT']
-                weight = df.at[0, 'WEIGHT']
-                country = df.at[0, 'COUNTRY']
-                is_active = next(iter([p[1] for p in self.player_table if p[0] == player_id]), "Unknown")
-
-                self.add_player_to_db(player_id, player_name, player_num, team_name,
-                                    team_ab, position, height, weight, country, is_active)
-
-                self._mark_player_success(player_id)
-                time.sleep(0.5)  # small delay to prevent rate limit
-                return True
-
-            except (ReadTimeout, ConnectionError) as e:
-                print(f"[Attempt {attempt}/{max_retries}] Timeout for player {player_id}: {e}")
-                if attempt < max_retries:
-                    time.sleep(random.uniform(*retry_delay_range))
+                item['row'], item['details'] = self._parse_payload(item['player_id'], item.pop('payload'))
             except Exception as e:
-                print(f"Unexpected error for player {player_id}: {e}")
-                break  # unknown error, don't retry
+                item['error_class'], item['error'] = PARSE, f"parse: {e}"
+        return item
+
+    def _validate_stage(self, item):
+        row = item.get('row')
+        if row is not None and (row[0] != item['player_id'] or not row[1]):
+            item['row'] = None
+            item['error_class'], item['error'] = PARSE, f"invalid record: {row[:2]}"
+        return item
+
+    def _write_stage(self, item):
+        player_id, row = item['player_id'], item.get('row')
+        if row is None and item['error_class'] != BUDGET:
+            log.warning("Skipping player %s (%s): %s", player_id, item['error_class'], item['error'])
+        self.save_player(player_id, row, item['error_class'], item['error'], item.get('details'))
 
-        self._mark_player_failed(player_id)
-        print(f"Skipping player {player_id} after {max_retries} failed attempts.")
-        return False
+    # -----------------------
+    # Team-roster bulk path
+    # -----------------------
+    def _request_team_roster(self, team_id, season):
+        """Raw CommonTeamRoster payload, served from the response cache when possible."""
+        def load():
+            self._rate_limit()
+            with self._api_timer('commonteamroster'):
+                return request_team_roster(team_id, season)
+
+        if self.cache is None:
+            return load()
+        return self.cache.fetch('commonteamroster', {'TeamID': team_id, 'Season': season}, load,
+                                parse_team_roster)
+
+    def _roster_fetch_stage(self, team):
+        team_id = team[0]
+        log.debug("Fetching roster for team ID: %s", team_id)
+        payload, error_class, error = self.retry_policy.call(
+            self._request_team_roster, team_id, self.roster_season)
+        if payload is None:
+            log.warning("Skipping roster of team %s (%s): %s", team_id, error_class, error)
+            return None
+        return team, parse_team_roster(payload)
+
+    def collect_rosters(self, season=None):
+        """Upsert every rostered player from one CommonTeamRoster call per team.
+
+        Covers jersey, position, height, weight and team for the current
+        players in 30 requests. Teams come from the Teams table, so
+        `add_teams_to_db` must have run. Returns the IDs that were stored;
+        players of a team whose roster failed are left to the per-player path.
+        """
+        self.roster_season = season or Season.default
+        self.writer.flush()
+        self.cursor.execute('SELECT team_id, team_nickname, team_ab FROM Teams')
+        team_rows = self.cursor.fetchall()
+        covered = set()
+
+        def save_roster(result):
+            (team_id, nickname, abbreviation), records = result
+            now = time.time()
+            for r in records:
+                if not in_shard(r['player_id'], self.shard):
+                    continue
+                covered.add(r['player_id'])
+                self.writer.add(SYNC_UPSERT, (r['player_id'], now, 1))
+                previous = self.history.fields(r['player_id'])
+                country = previous[7] if previous else None  # rosters don't carry it
+                if not self.history.record(r['player_id'], (
+                        r['full_name'], r['jersey_num'], nickname, abbreviation, r['pos'],
+                        r['height'], r['weight'], country, 'Active'), now):
+                    continue
+                self.writer.add(ROSTER_PLAYER_UPSERT, (
+                    r['player_id'], r['full_name'], r['jersey_num'], nickname, abbreviation,
+                    r['pos'], r['height'], r['weight'], 'Active',
+                    *typed_player_columns(r['jersey_num'], r['pos'], r['height'], r['weight'], 'Active'),
+                    fold_name(r['full_name'])))
+
+        pipeline = IngestPipeline(self.buffer_size).add_stage(
+            'roster', self._roster_fetch_stage, min(self.workers, len(team_rows)) or 1)
+        pipeline.run(team_rows, save_roster)
+        self.writer.flush()
+        log.info("Rosters: %d active players from %d teams.", len(covered), len(team_rows))
+        return covered
+
+    def _needs_player_info(self, covered):
+        """Rostered players whose CommonPlayerInfo was never fetched.
+
+        Keyed on the PlayerDetails row that fetch writes, not on a NULL
+        country: some players' info has no country, and they would otherwise
+        be re-fetched every run. A country still counts for rows stored
+        before PlayerDetails existed.
+        """
+        self.cursor.execute('''
+            SELECT player_id FROM Players p
+            WHERE country IS NULL
+              AND NOT EXISTS (SELECT 1 FROM PlayerDetails d WHERE d.player_id = p.player_id)
+        ''')
+        return {pid for (pid,) in self.cursor.fetchall()} & covered
 
     # -----------------------
     # Main collection logic
     # -----------------------
-    def get_player_info_api(self, player_ids):
-        for pid in player_ids:
-            self.fetch_and_save_player(pid)
+    def run_pipeline(self, player_ids, workers=None):
+        """Stream `player_ids` through fetch -> parse -> validate -> batched write.
+
+        Fetching runs on `workers` threads, parse and validate on one each;
+        the IDs are pulled and the rows written on this thread, so the single
+        sqlite3 connection is never shared. Logs per-stage throughput.
+        """
+        pipeline = (IngestPipeline(self.buffer_size)
+                    .add_stage('fetch', self._fetch_stage, workers or self.workers)
+                    .add_stage('parse', self._parse_stage)
+                    .add_stage('validate', self._validate_stage))
+        items = ({'player_id': pid, 'error_class': None, 'error': None} for pid in player_ids)
+        pipeline.run(items, self._write_stage)
+        self.writer.flush()
+        self.last_pipeline = pipeline
+        log.info(pipeline.report())
+        return pipeline
+
+    def get_player_info_api(self, player_ids, workers=None):
+        """Fetch and save players through the streaming pipeline."""
+        self.run_pipeline(player_ids, workers)
+
+    def build_roster_index(self):
+        """Index the static player list by ID. Called once per run."""
+        self.roster = RosterIndex.from_static(self.get_all_players_api())
+        return self.roster
+
+    def _claimed_ids(self, chunk_size):
+        """Claim due jobs lazily, one chunk at a time, as the pipeline asks for them."""
+        while not self.retry_policy.budget_exhausted():
+            player_ids = self.queue.claim(chunk_size)
+            if not player_ids:
+                return
+            yield from player_ids
+
+    def process_queue(self, chunk_size=None):
+        """Fetch every job that is due right now."""
+        self.run_pipeline(self._claimed_ids(chunk_size or max(64, self.workers * 4)))
 
     def retry_skipped_players_until_done(self):
-        """Keep retrying skipped players until the file is gone."""
-        while self.skipped_players:
-            print(f"Retrying {len(self.skipped_players)} skipped players...")
-            for pid in list(self.skipped_players):
-                self.fetch_and_save_player(pid)
-            if not self.skipped_players:
-                print("All skipped players processed!")
-
-    def collect_data(self):
+        """Work the queue until every job is done or dead."""
+        if not self.roster:
+            self.build_roster_index()
+        started = self.queue.clock()
+        while True:
+            self.process_queue()
+            wait = self.queue.seconds_until_next_due()
+            if wait is None:
+                break
+            if self.retry_policy.budget_exhausted():
+                log.warning("Time budget used up; %d players stay queued for the next run.", self.queue.count())
+                return
+            log.info("Retrying %d skipped players in %.0fs...", self.queue.count(FAILED), wait)
+            time.sleep(wait)
+
+        exhausted, permanent = self.queue.dead_since(started)
+        if exhausted:
+            log.warning("Gave up on %d players after %d attempts.", exhausted, self.queue.max_attempts)
+        if permanent:
+            log.warning("%d players failed permanently.", permanent)
+        log.info("All skipped players processed!")
+
+    def collect_data(self, delta=False, staleness_days=7, resume=True, rosters=False):
+        """Collect players and teams.
+
+        With `delta=True` only new, changed and stale active players are
+        fetched (see `select_players_to_sync`); otherwise every player is.
+        With `rosters=True` current players come from the 30 team rosters
+        first, and only the rest go through per-player CommonPlayerInfo calls.
+        Rosters carry no country: a delta run leaves it for later, and only a
+        full run also fetches the info of rostered players who never had it.
+        If the job queue still holds unfinished work and `resume` is set,
+        that run is continued instead of starting a new one.
+        """
+        self.retry_policy.start_budget()
+        started, totals = time.perf_counter(), self._run_totals()
+
         # Load from API
-        all_nba_players = self.get_all_players_api()
+        self.build_roster_index()
         all_nba_teams = self.get_all_teams_api()
 
-        self.player_table = [[p['id'], 'Active' if p['is_active'] else 'Not Active']
-                             for p in all_nba_players]
         self.team_table = [[t['id'], t['full_name'], t['abbreviation'], t['nickname'],
                             t['city'], t['state'], t['year_founded']]
                            for t in all_nba_teams]
 
-        # Add players & teams
-        self.get_player_info_api(self.get_player_id_api())
-        self.retry_skipped_players_until_done()
+        # Add players & teams; an interrupted run resumes from its queue. Failed jobs
+        # alone don't make one: they are retried along with whatever this run enqueues
+        unfinished = self.queue.count(PENDING, IN_FLIGHT)
+        if resume and unfinished:
+            log.info("Resuming interrupted run: %d players left.", unfinished)
+        else:
+            if delta:
+                player_ids = self.select_players_to_sync(staleness_days)
+                log.info("Delta sync: %d of %d players need fetching.", len(player_ids), len(self.roster))
+            else:
+                player_ids = self.get_player_id_api()
+            if rosters:
+                self.add_teams_to_db()
+                covered = self.collect_rosters()
+                if not delta:
+                    covered -= self._needs_player_info(covered)
+                player_ids = [pid for pid in player_ids if pid not in covered]
+                log.info("%d players left for per-player requests.", len(player_ids))
+            self.queue.enqueue(player_ids)
+
+        if self.cache is not None and self.cache.offline:
+            self.process_queue()  # nothing to wait for when replaying the cache
+        else:
+            self.retry_skipped_players_until_done()
         self.add_teams_to_db()
-        print('Data collection completed.')
+        self._record_run(time.perf_counter() - started, totals)
+        log.info('Data collection completed.')
+        log.info("Run summary:\n%s", self.metrics.summary())
+
+    def _run_totals(self):
+        """Running totals behind the per-run gauges; they span every collect_data call."""
+        players = self.metrics.counter('nba_players_total', 'Players processed, by result', ('result',))
+        http = self.sessions.stats()
+        totals = {result: players.labels(result=result).value
+                  for result in ('stored', 'failed', 'dead', 'deferred')}
+        totals.update(trips=self.retry_policy.breaker.trips,
+                      connections=http['connections'], reused=http['reused'])
+        if self.cache is not None:
+            totals.update(cache_hits=self.cache.hits, cache_misses=self.cache.misses)
+        return totals
+
+    def _record_run(self, seconds, before):
+        """Per-run gauges: wall time, throughput and what the shared helpers saw,
+        as the change in `_run_totals` since `before` (taken when the run started)."""
+        gauge = self.metrics.gauge
+        run = {key: value - before.get(key, 0) for key, value in self._run_totals().items()}
+        gauge('nba_run_seconds', 'Wall time of the last collect_data run').set(seconds)
+        gauge('nba_players_per_second', 'Players stored per second in the last run').set(
+            run['stored'] / seconds if seconds else 0.0)
+        players = gauge('nba_run_players', 'Players processed in the last run, by result', ('result',))
+        for result in ('stored', 'failed', 'dead', 'deferred'):
+            players.set(run[result], result=result)
+        gauge('nba_breaker_trips', 'Circuit breaker trips in the last run').set(run['trips'])
+        jobs = gauge('nba_jobs', 'Job queue size by state', ('state',))
+        for state in (FAILED, DEAD):
+            jobs.set(self.queue.count(state), state=state)
+        gauge('nba_http_connections', 'Pooled HTTP connections opened in the last run').set(run['connections'])
+        gauge('nba_http_reused_requests', 'Requests that reused a pooled connection in the last run').set(
+            run['reused'])
+        if self.cache is not None:
+            gauge('nba_cache_hits', 'Response cache hits in the last run').set(run['cache_hits'])
+            gauge('nba_cache_misses', 'Response cache misses in the last run').set(run['cache_misses'])
+
+    def write_metrics(self, json_path=None, prom_path=None):
+        """Export this run's metrics as a JSON report and/or a Prometheus textfile."""
+        if json_path:
+            self.metrics.write_json(json_path)
+        if prom_path:
+            self.metrics.write_prometheus(prom_path)
 
     # -----------------------
     # Utility
     # -----------------------
     def get_player_info_db(self):
+        self.writer.flush()
         self.cursor.execute('SELECT * FROM Players')
         return self.cursor.fetchall()
 
+    def players_changed_since(self, since, limit=None):
+        """Player versions that started after `since` (a Unix time); see PlayerHistory."""
+        return self.history.changed_since(since, limit)
+
     def get_team_info_db(self):
         self.cursor.execute('SELECT * FROM Teams ORDER BY team_nickname')
         return self.cursor.fetchall()
 
     def close(self):
+        self.writer.flush()
+        log.info(self.sessions.report())
+        self.sessions.close()
+        if self.cache is not None:
+            log.info("Response cache: %d hits, %d misses.", self.cache.hits, self.cache.misses)
+            self.cache.close()
         self.db.close()
 
 
 def main():
-    collector = NBADataCollector()
-    collector.collect_data()
+    parser = argparse.ArgumentParser(description="Collect NBA players and teams into SQLite.")
+    parser.add_argument("--db", default="nba_info.db")
+    parser.add_argument("--workers", type=int, default=1, help="concurrent fetch workers")
+    parser.add_argument("--rate", type=float, default=2.0, help="max API requests per second")
+    parser.add_argument("--batch-size", type=int, default=500, help="rows per write transaction")
+    parser.add_argument("--wal", action="store_true", help="use WAL journaling")
+    parser.add_argument("--synchronous", help="PRAGMA synchronous value, e.g. NORMAL")
+    parser.add_argument("--cache", help="path of an on-disk API response cache")
+    parser.add_argument("--offline", action="store_true", help="serve responses only from --cache")
+    parser.add_argument("--budget", type=float, help="stop fetching after this many minutes")
+    parser.add_argument("--restart", action="store_true", help="ignore an interrupted run and start over")
+    parser.add_argument("--delta", action="store_true", help="only fetch new, changed and stale players")
+    parser.add_argument("--stale-days", type=float, default=7, help="refetch active players older than this")
+    parser.add_argument("--rosters", action="store_true", help="take current players from the 30 team rosters")
+    parser.add_argument("--manifest", help="shard manifest; collect one shard into its own DB")
+    parser.add_argument("--shard", type=int, help="shard index to collect (with --manifest)")
+    parser.add_argument("--metrics-json", help="write a JSON run report here")
+    parser.add_argument("--prom-file", help="write Prometheus textfile metrics here")
+    parser.add_argument("--log-level", default="INFO", help="DEBUG logs every request and attempt")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.offline and not args.cache:
+        parser.error("--offline needs --cache")
+    if (args.manifest is None) != (args.shard is None):
+        parser.error("--manifest and --shard go together")
+    cache = ResponseCache(args.cache, offline=args.offline) if args.cache else None
+    budget = args.budget * 60 if args.budget else None
+
+    db_name, skipped_file, shard = args.db, "skipped_players.txt", None
+    if args.manifest:
+        manifest = ShardManifest.load(args.manifest)
+        shard = manifest.shard(args.shard)
+        db_name = manifest.db_path(args.shard)
+        skipped_file = db_name + ".skipped"  # the legacy file belongs to the main DB
+
+    collector = NBADataCollector(db_name, skipped_file, workers=args.workers, requests_per_second=args.rate,
+                                 batch_size=args.batch_size, wal=args.wal, synchronous=args.synchronous,
+                                 cache=cache, retry_policy=RetryPolicy(budget_seconds=budget), shard=shard)
+    collector.collect_data(delta=args.delta, staleness_days=args.stale_days, resume=not args.restart,
+                           rosters=args.rosters)
+    collector.write_metrics(args.metrics_json, args.prom_file)
     collector.close()
 
 
@@ -0,0 +1,106 @@
+from collections import Counter
+from PlayerInfoParser import fold_name
+
+
+def trigrams(text):
+    """Trigrams of a folded name; a leading space marks the start of each word."""
+    padded = ' ' + text
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """Trigram index over folded player names, for typo-tolerant ranked search.
+
+    Names are folded once (lowercase, no accents or punctuation, see
+    PlayerInfoParser.fold_name), so 'jokic' finds 'Nikola Jokić'. A search
+    counts shared trigrams over the posting sets of the query's trigrams only:
+    names containing the query rank first (word prefixes ahead of the rest),
+    then names sharing most of its trigrams, which catches typos. add()
+    re-indexes a single name, so the index can follow inserts incrementally.
+    Keys are small non-negative ints (FacetIndex uses bit positions).
+
+    One- and two-letter queries have no trigrams and match most names, so
+    instead of ranking every hit they walk the names once in rank order
+    (shortest first, see by_length), which is the ranking already.
+    """
+
+    min_similarity = 0.5  # share of the query's trigrams a typo match must have
+
+    def __init__(self):
+        self.names = {}  # key -> folded name
+        self.postings = {}  # trigram -> set of keys
+        self._by_length = None  # (key, ' ' + name) by name length then key; rebuilt after add()
+
+    def add(self, key, name):
+        """Index (or re-index) one name under `key`."""
+        folded = fold_name(name)
+        old = self.names.get(key)
+        if old == folded:
+            return
+        if old is not None:
+            for gram in trigrams(old):
+                self.postings[gram].discard(key)
+        self.names[key] = folded
+        self._by_length = None
+        for gram in trigrams(folded):
+            self.postings.setdefault(gram, set()).add(key)
+
+    def search(self, query, limit=None, keys=None):
+        """Keys whose names match `query`, best match first.
+
+        With `keys` (the exact hits of a shorter query the new one contains,
+        see exact_hits) only those names are tested for containing the
+        query. Typo matches are always looked up in the whole index: a typo
+        match of the longer query need not have matched the shorter one.
+        """
+        query = fold_name(query)
+        if not query:
+            return []
+        if len(query) < 3 and keys is None:
+            return self._search_short(query)[:limit]
+        names = self.names
+        grams = trigrams(query) if len(query) >= 3 else ()  # shorter says nothing
+        shared = Counter()
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting:
+                shared.update(posting)
+        # A name containing the query has all its inner trigrams, so it is in `shared`
+        pool = keys if keys is not None else (shared if grams else names)
+        exact = {key for key in pool if query in names[key]}
+
+        # Rank packed into one int: tier, then name length, then key
+        word_start = ' ' + query
+        ranked = [((0 if names[key].startswith(query) or word_start in names[key] else 1) << 48)
+                  | (len(names[key]) << 32) | key for key in exact]
+        needed = max(2, self.min_similarity * len(grams))
+        ranked += [((2 + len(grams) - count) << 48) | (len(names[key]) << 32) | key
+                   for key, count in shared.items() if count >= needed and key not in exact]
+        ranked.sort()
+        return [rank & 0xFFFFFFFF for rank in ranked[:limit]]
+
+    def by_length(self):
+        """(key, ' ' + name) pairs ordered as search ranks within a tier."""
+        if self._by_length is None:
+            self._by_length = sorted(((key, ' ' + name) for key, name in self.names.items()),
+                                     key=lambda pair: (len(pair[1]), pair[0]))
+        return self._by_length
+
+    def _search_short(self, query):
+        # Same order as search(): word starts, then other substring hits, each by length
+        word_start = ' ' + query
+        first, rest = [], []
+        for key, name in self.by_length():
+            if query in name:
+                (first if word_start in name else rest).append(key)
+        return first + rest
+
+    def exact_hits(self, query, ranked):
+        """The leading keys of a search() result whose names contain `query`."""
+        query = fold_name(query)
+        hits = []
+        for key in ranked:
+            if query not in self.names[key]:
+                break  # substring matches rank ahead of every typo match
+            hits.append(key)
+        return hits
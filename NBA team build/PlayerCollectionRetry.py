@@ -1,53 +1,72 @@
-import os
+import logging
 import time
-import random
-from nba_api.stats.endpoints import CommonPlayerInfo
-from requests.exceptions import ReadTimeout, ConnectionError
+from WorkQueue import FAILED
+from RetryPolicy import RetryPolicy, PERMANENT, BUDGET
 
-class PlayerCollectionRetry:
-    def __init__(self, skipped_file="skipped_players.txt", max_retries=3, retry_delay_range=(2, 5)):
-        self.skipped_file = skipped_file
-        self.max_retries = max_retries
-        self.retry_delay_range = retry_delay_range
-        self.skipped_players = set(self._load_skipped_players())  # no duplicates
+log = logging.getLogger(__name__)
 
-    def _load_skipped_players(self):
-        if os.path.exists(self.skipped_file):
-            with open(self.skipped_file, "r") as f:
-                return [int(line.strip()) for line in f if line.strip().isdigit()]
-        return []
+class PlayerCollectionRetry:
+    def __init__(self, queue, retry_policy=None, roster=None, sessions=None):
+        self.queue = queue  # WorkQueue, usually NBADataCollector.queue
+        self.retry_policy = retry_policy or RetryPolicy()  # share the collector's to share its breaker
+        self.roster = roster  # RosterIndex shared with NBADataCollector, if any
+        # The collector's SessionProvider, for its pool report. Without one, requests go
+        # through whatever session is installed -- never replace the collector's pool here
+        self.sessions = sessions
 
-    def save_skipped_players(self):
-        if self.skipped_players:
-            with open(self.skipped_file, "w") as f:
-                for pid in sorted(self.skipped_players):
-                    f.write(f"{pid}\n")
-        elif os.path.exists(self.skipped_file):
-            os.remove(self.skipped_file)
+    @property
+    def skipped_players(self):
+        return set(self.queue.ids(FAILED))
 
     def attempt_player_fetch(self, player_id, fetch_func):
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                result = fetch_func(player_id)
-                if result:
-                    self.mark_player_success(player_id)
-                return result
-            except Exception as e:
-                print(f"[Retry {attempt}/{self.max_retries}] Player {player_id} failed: {e}")
-                if attempt < self.max_retries:
-                    time.sleep(random.uniform(*self.retry_delay_range))
-        self.skipped_players.add(player_id)
-        self.save_skipped_players()
+        result, error_class, error = self.retry_policy.call(fetch_func, player_id)
+        if result:
+            self.mark_player_success(player_id)
+            return result
+        if error_class == BUDGET:
+            self.queue.release(player_id)
+        elif error_class == PERMANENT:
+            self.queue.mark_dead(player_id, error)
+        else:
+            self.queue.mark_failed(player_id, error or "fetch returned no data")
         return None
 
     def mark_player_success(self, player_id):
-        if player_id in self.skipped_players:
-            self.skipped_players.remove(player_id)
-            self.save_skipped_players()
+        self.queue.mark_done(player_id)
+
+    def drop_unknown_players(self):
+        """Retire skipped IDs the roster index doesn't know; they can never succeed."""
+        if not self.roster:
+            return
+        unknown = [pid for pid in self.queue.ids() if pid not in self.roster]
+        if unknown:
+            log.info("Dropping %d skipped IDs not in the player roster.", len(unknown))
+            for pid in unknown:
+                self.queue.mark_dead(pid, "not in player roster")
 
     def run_until_empty(self, fetch_func):
-        while self.skipped_players:
-            for pid in list(self.skipped_players):
-                fetch_func(pid)
-            if not self.skipped_players:
-                print("✅ All skipped players processed.")
+        """Retry queued players until every job is done or dead."""
+        started = self.queue.clock()
+        self.drop_unknown_players()
+        while not self.retry_policy.budget_exhausted():
+            player_ids = self.queue.claim(100)
+            if player_ids:
+                for pid in player_ids:
+                    self.attempt_player_fetch(pid, fetch_func)
+                continue
+            wait = self.queue.seconds_until_next_due()
+            if wait is None or self.retry_policy.budget_exhausted():
+                break
+            time.sleep(wait)
+        left = self.queue.count()
+        if left:
+            log.warning("Time budget used up; %d players stay queued for the next run.", left)
+            return
+        exhausted, permanent = self.queue.dead_since(started)
+        if exhausted:
+            log.warning("Gave up on %d players after %d attempts.", exhausted, self.queue.max_attempts)
+        if permanent:
+            log.warning("%d players failed permanently.", permanent)
+        if self.sessions:
+            log.info(self.sessions.report())
+        log.info("✅ All skipped players processed.")
@@ -1,37 +1,124 @@
+import bisect
+import logging
+import queue
+import sqlite3
+import threading
+import time
 import tkinter as tk
+from contextlib import contextmanager
 from tkinter import ttk
-from NBADataCollector import NBADataCollector
+from DatabaseSchema import migrate
+from MetadataCache import MetadataCache
 from FilterSection import FilterSection
 from PlayerTable import PlayerTable
 from MyTeamManager import MyTeamManager
+from PlayerQuery import PlayerQuery
+from FacetIndex import FacetIndex
+from PlayerInfoParser import fold_name
+
+log = logging.getLogger(__name__)
 
 class PlayerDisplayApp:
-    def __init__(self, root, page_size=10):
+    poll_ms = 15  # how often the Tk loop checks for a finished filter pass or index load
+    first_page_budget_ms = 250  # startup time-to-first-page; logged as a warning when exceeded
+
+    def __init__(self, root, page_size=10, db_name='nba_info.db'):
+        self.started = time.perf_counter()
+        self.phases = []  # (startup phase, seconds)
         self.root = root
         self.root.title("NBA Player Display")
 
-        self.collector = NBADataCollector()
+        with self._phase("open db"):
+            # The app only reads, so it skips NBADataCollector and its HTTP and ingest setup
+            self.db_name = db_name
+            self.db = sqlite3.connect(db_name)
+            migrate(self.db)
         self.page_size = page_size
-        self.original_player_list = [player for player in self.collector.get_player_info_db() if player is not None]  # Ensure valid data
-        self.player_list = self.original_player_list[:]  # Copy for filtering
-        self.total_players = len(self.player_list)
-        self.total_pages = (self.total_players + self.page_size - 1) // self.page_size
-        self.current_page = 0
+        self.query = PlayerQuery(self.db)
+        with self._phase("metadata"):
+            self.metadata = MetadataCache(self.query).load()
 
-        self.my_team = []
+        # Filters run on the facet bitsets, built off the Tk thread once the first page
+        # is up; only the rows on screen are read from the DB. Until then they run as SQL
+        self.facets = None
+        self.index_results = queue.Queue()
+        self.matches = None
+        self.ranking = None  # name-search order of the matches, when searching by name
+        self.filters = {}
+        self.searched_name = ''  # folded name behind name_ranking
+        self.name_ranking = None  # every player matching it, before the other filters
+        self.name_exact = None  # the ones containing it, which a longer name can narrow
+        self.generation = 0  # bumped per filter change; older results are dropped
+        self.results = queue.Queue()
+        self.polling = False
+        with self._phase("first page"):
+            self.total_players = self.query.count()
+            self.total_pages = (self.total_players + self.page_size - 1) // self.page_size
+            self.current_page = 0
+            # Per page, where it starts: the player_id it follows until the index is
+            # loaded, then its bit position (or ranking index)
+            self.page_keys = [None]
+            self.player_list = self._fetch_page()
 
-        # Fetch unique teams and countries
-        self.teams = sorted(set(team[3] for team in self.collector.get_team_info_db()))
-        self.positions = ["Guard", "Center", "Forward"]
-        self.countries = sorted(set(player[8] for player in self.original_player_list if player[8]))
+        self.my_team = []
 
         # Create the filter and table
-        self.filter_section = FilterSection(self, root)
-        self.player_table = PlayerTable(self, root)
-        self.my_team_manager = MyTeamManager(self)
+        with self._phase("widgets"):
+            self.filter_section = FilterSection(self, root)
+            self.player_table = PlayerTable(self, root)
+            self.my_team_manager = MyTeamManager(self)
+
+            # Create navigation buttons
+            self.create_navigation()
+
+        self.root.after_idle(self._first_page_shown)
+
+    @contextmanager
+    def _phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def _first_page_shown(self):
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        log.info("Startup: %s; first page shown after %.1f ms",
+                 ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in self.phases), elapsed_ms)
+        if elapsed_ms > self.first_page_budget_ms:
+            log.warning("Time to first page %.1f ms is over the %d ms budget.", elapsed_ms, self.first_page_budget_ms)
+
+        threading.Thread(target=self._index_worker, daemon=True).start()
+        self.root.after(self.poll_ms, self._poll_index)
+
+    def _index_worker(self):
+        # sqlite3 connections stay on the thread that made them, so the worker opens its own
+        start = time.perf_counter()
+        db = sqlite3.connect(self.db_name)
+        try:
+            self.index_results.put((FacetIndex.from_db(db), time.perf_counter() - start))
+        finally:
+            db.close()
 
-        # Create navigation buttons
-        self.create_navigation()
+    def _poll_index(self):
+        if self.index_results.empty():
+            self.root.after(self.poll_ms, self._poll_index)
+            return
+        facets, build_seconds = self.index_results.get()
+        self.show_index(facets)
+        log.info("Player index ready %.1f ms after startup (%d players, built in %.1f ms off the Tk thread)",
+                 (time.perf_counter() - self.started) * 1000, len(facets.ids), build_seconds * 1000)
+
+    def show_index(self, facets):
+        """Switch paging to the loaded index and rerun any filter set while it loaded."""
+        # Player_id page keys become bit positions; both run in player_id order
+        self.page_keys = [0 if key is None else bisect.bisect_right(facets.ids, key) for key in self.page_keys]
+        self.page_end = 0 if self.page_end is None else bisect.bisect_right(facets.ids, self.page_end)
+        self.facets = facets
+        self.matches = facets.all
+        self.filter_section.update_counts(facets.facet_counts())
+        if self.filters:
+            self.apply_filter(force=True)  # adds typo matches, ranking and counts
 
     def create_navigation(self):
         nav_frame = ttk.Frame(self.root)
@@ -48,40 +135,73 @@ class PlayerDisplayApp:
 
         self.update_navigation()
 
-    def apply_filter(self):
-        name_filter = self.filter_section.name_entry.get().strip().lower()
-        team_filter = self.filter_section.team_var.get()
-        position_filter = self.filter_section.position_var.get()
-        country_filter = self.filter_section.country_var.get()
-        active_filter = self.filter_section.active_var.get()
-
-        team_ab = None
-        if team_filter != "All":
-            for team in self.collector.get_team_info_db():
-                if team[3] == team_filter:
-                    team_ab = team[2]
-                    break
-
-        self.player_list = [
-            player for player in self.original_player_list
-            if (name_filter in player[1].lower() if name_filter else True) and
-            (team_ab is None or player[4] == team_ab) and
-            (position_filter == "All" or position_filter.lower() in player[5].lower()) and
-            (country_filter == "All" or player[8] == country_filter) and
-            (player[9] == "Active" if active_filter else True)
-        ]
-
-        self.total_players = len(self.player_list)
+    def apply_filter(self, force=False):
+        """Filter for the FilterSection values; `force` (the Filter button) always
+        runs a fresh search, even when the values are unchanged."""
+        if self.filter_section.filters == self.filters and not force:
+            return  # e.g. a key release that didn't change the text
+        self.filters = dict(self.filter_section.filters)
+        if self.facets is None:
+            self.apply_sql_filter()
+            return
+        filters = dict(self.filters)
+        name = fold_name(filters.pop('name'))
+
+        # Typing more of a name narrows its substring matches; typo matches are
+        # searched afresh, and a short or fruitless earlier name is no base
+        narrowing = (name and not force and len(self.searched_name) >= 3 and self.name_exact
+                     and self.searched_name in name)
+        previous = self.name_exact if narrowing else None
+
+        # The pass runs off the Tk thread so typing never waits on it
+        self.generation += 1
+        threading.Thread(target=self._filter_worker, args=(self.generation, name, previous, filters),
+                         daemon=True).start()
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_ms, self._poll_filter)
+
+    def apply_sql_filter(self):
+        """Filter through PlayerQuery while the index loads: substring name
+        matches in player_id order, paged by keyset like the first page."""
+        self.total_players = self.query.count(**self.filters)
+        self.total_pages = (self.total_players + self.page_size - 1) // self.page_size
+        self.current_page = 0
+        self.page_keys = [None]
+        self.update_table()
+        self.update_navigation()
+
+    def _filter_worker(self, generation, name, previous, filters):
+        self.results.put((generation, name, self.facets.filter(name, previous, **filters)))
+
+    def _poll_filter(self):
+        latest = None
+        while not self.results.empty():
+            generation, name, result = self.results.get()
+            if generation == self.generation:
+                latest = (name, result)
+        if latest is None:
+            self.root.after(self.poll_ms, self._poll_filter)
+            return
+        self.polling = False
+        self.show_filter_result(*latest)
+
+    def show_filter_result(self, name, result):
+        self.searched_name = name
+        self.name_ranking, self.name_exact, self.matches, self.ranking, counts = result
+        # A name search pages through its ranking rather than player_id order
+        self.total_players = self.matches.bit_count()
         self.total_pages = (self.total_players + self.page_size - 1) // self.page_size
         self.current_page = 0
+        self.page_keys = [0]
+        self.filter_section.update_counts(counts)
         self.update_table()
         self.update_navigation()
 
     def add_to_my_team(self, row):
-        start_index = self.current_page * self.page_size
-        player_index = start_index + row
-        if player_index < len(self.player_list):
-            player = self.player_list[player_index]
+        # player_list holds just the current page
+        if row < len(self.player_list):
+            player = self.player_list[row]
             if player not in self.my_team:
                 if len(self.my_team) < 5:
                     self.my_team.append(player)
@@ -99,11 +219,25 @@ class PlayerDisplayApp:
         self.my_team.remove(player)
         self.my_team_manager.refresh_display()
 
+    def _fetch_page(self):
+        start = self.page_keys[self.current_page]
+        if self.facets is None:
+            rows = self.query.page(after=start, limit=self.page_size, **self.filters)
+            self.page_end = rows[-1][0] if rows else start
+            return rows
+        if self.ranking is not None:
+            positions = self.ranking[start:start + self.page_size]
+            self.page_end = start + len(positions)
+        else:
+            positions = list(self.facets.positions(self.matches, start, self.page_size))
+            self.page_end = positions[-1] + 1 if positions else start
+        ids = self.facets.player_ids(positions)
+        rows = {row[0]: row for row in self.query.rows(ids)}
+        return [rows[player_id] for player_id in ids if player_id in rows]
+
     def update_table(self):
-        start_index = self.current_page * self.page_size
-        end_index = start_index + self.page_size
-        current_page_players = self.player_list[start_index:end_index]
-        self.player_table.update_table(current_page_players)
+        self.player_list = self._fetch_page()
+        self.player_table.update_table(self.player_list)
 
     def previous_page(self):
         if self.current_page > 0:
@@ -113,6 +247,8 @@ class PlayerDisplayApp:
 
     def next_page(self):
         if (self.current_page + 1) * self.page_size < self.total_players:
+            if len(self.page_keys) == self.current_page + 1:
+                self.page_keys.append(self.page_end)
             self.current_page += 1
             self.update_table()
             self.update_navigation()
@@ -0,0 +1,139 @@
+import hashlib
+import time
+
+# Player record fields that make up a version, in Players/PlayerHistory column order
+HISTORY_FIELDS = ['full_name', 'jersey_num', 'team_name', 'team_ab', 'pos',
+                  'height', 'weight', 'country', 'is_active']
+
+# Fields stored in INTEGER columns, where SQLite turns numeric text such as '00' into 0
+INTEGER_FIELDS = {HISTORY_FIELDS.index('jersey_num'), HISTORY_FIELDS.index('weight')}
+
+VERSION_INSERT = f'''
+    INSERT INTO PlayerHistory (player_id, valid_from, content_hash, {", ".join(HISTORY_FIELDS)})
+    VALUES (?,?,?,{",".join("?" * len(HISTORY_FIELDS))})
+'''
+
+
+def _number(value):
+    """`value` as a plain int (or float) when it reads as a number, else unchanged.
+
+    Whatever an INTEGER column makes of the API's text keeps its numeric value,
+    so the fetched text and the stored value come out the same here.
+    """
+    if isinstance(value, str):
+        for convert in (int, float):
+            try:
+                value = convert(value)
+                break
+            except ValueError:
+                pass
+    if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+        value = float(value)  # past 64 bits SQLite keeps a REAL
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def content_hash(fields):
+    """Stable hash of a record's fields, compared as text. jersey_num and weight
+    are compared as numbers, so the API's '00' and the 0 SQLite stores for it
+    in an INTEGER column are the same version."""
+    text = '\x1f'.join('' if v is None else str(_number(v) if i in INTEGER_FIELDS else v)
+                        for i, v in enumerate(fields))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def seed_versions(db, now=None):
+    """Open a version for every Players row the current version doesn't match,
+    e.g. after rows were bulk-loaded around PlayerHistory. Returns how many."""
+    rows = db.execute(f'''
+        SELECT {", ".join("p." + f for f in HISTORY_FIELDS)}, p.player_id
+        FROM Players p LEFT JOIN PlayerCurrent h ON h.player_id = p.player_id
+        WHERE h.player_id IS NULL OR {" OR ".join(f"h.{f} IS NOT p.{f}" for f in HISTORY_FIELDS)}
+    ''').fetchall()
+    now = now or time.time()
+    with db:
+        db.executemany(VERSION_INSERT, ((pid, now, content_hash(fields), *fields) for *fields, pid in rows))
+    return len(rows)
+
+
+class PlayerHistory:
+    """Append-only versions of each player record.
+
+    Every distinct version is a PlayerHistory row with valid_from/valid_to
+    times and a content hash; the open version (valid_to IS NULL) is the
+    current one, also exposed as the PlayerCurrent view. An insert trigger
+    closes the previous version, so a new version is a single buffered insert.
+    The current hashes are kept in memory: an unchanged fetch costs one dict
+    lookup and writes nothing.
+    """
+
+    def __init__(self, db, writer, clock=time.time):
+        self.db = db
+        self.writer = writer
+        self.clock = clock
+        self.current = None  # player_id -> (hash, fields), loaded on first use
+
+    def _load(self):
+        self.writer.flush()
+        rows = self.db.execute(f'''
+            SELECT player_id, content_hash, {", ".join(HISTORY_FIELDS)}
+            FROM PlayerHistory WHERE valid_to IS NULL
+        ''').fetchall()
+        self.current, missing = {}, []
+        for pid, stored_hash, *fields in rows:
+            digest = content_hash(fields)
+            self.current[pid] = (digest, fields)
+            if stored_hash is None:  # versions backfilled by the migration
+                missing.append((digest, pid))
+        if missing:
+            with self.db:
+                self.db.executemany('UPDATE PlayerHistory SET content_hash = ? '
+                                    'WHERE player_id = ? AND valid_to IS NULL',
+                                    [(d, p) for d, p in missing])
+
+    def fields(self, player_id):
+        """Fields of the current version, or None for an unknown player."""
+        if self.current is None:
+            self._load()
+        entry = self.current.get(player_id)
+        return entry[1] if entry else None
+
+    def record(self, player_id, fields, now=None):
+        """Queue a new version if `fields` differ from the current one. Returns True if so."""
+        if self.current is None:
+            self._load()
+        digest = content_hash(fields)
+        entry = self.current.get(player_id)
+        if entry is not None and entry[0] == digest:
+            return False
+        self.writer.add(VERSION_INSERT, (player_id, now or self.clock(), digest, *fields))
+        self.current[player_id] = (digest, list(fields))
+        return True
+
+    # -----------------------
+    # Queries
+    # -----------------------
+    def changed_since(self, since, limit=None):
+        """Versions that started after `since`, oldest first (uses idx_player_history_valid_from).
+
+        Poll with the largest valid_from seen so far to get only new changes.
+        """
+        self.writer.flush()
+        sql = f'''
+            SELECT player_id, valid_from, valid_to, content_hash, {", ".join(HISTORY_FIELDS)}
+            FROM PlayerHistory WHERE valid_from > ? ORDER BY valid_from
+        '''
+        params = (since,)
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params += (limit,)
+        return self.db.execute(sql, params).fetchall()
+
+    def versions(self, player_id):
+        """Every version of one player, oldest first."""
+        self.writer.flush()
+        return self.db.execute(f'''
+            SELECT valid_from, valid_to, content_hash, {", ".join(HISTORY_FIELDS)}
+            FROM PlayerHistory WHERE player_id = ? ORDER BY valid_from, version_id
+        ''', (player_id,)).fetchall()
@@ -0,0 +1,172 @@
+# Turns raw CommonPlayerInfo (and CommonTeamRoster) payloads into plain
+# records. Deliberately pandas-free: this runs once per player on every
+# ingestion run.
+
+import unicodedata
+
+# Response field -> record key
+PLAYER_FIELDS = {
+    'DISPLAY_FIRST_LAST': 'full_name',
+    'JERSEY': 'jersey_num',
+    'TEAM_NAME': 'team_name',
+    'TEAM_ABBREVIATION': 'team_ab',
+    'POSITION': 'pos',
+    'HEIGHT': 'height',
+    'WEIGHT': 'weight',
+    'COUNTRY': 'country',
+}
+
+# CommonTeamRoster field -> record key (the roster has no country)
+ROSTER_FIELDS = {
+    'PLAYER_ID': 'player_id',
+    'PLAYER': 'full_name',
+    'NUM': 'jersey_num',
+    'POSITION': 'pos',
+    'HEIGHT': 'height',
+    'WEIGHT': 'weight',
+}
+
+# Rosters abbreviate positions; CommonPlayerInfo spells them out
+ROSTER_POSITIONS = {
+    'G': 'Guard', 'F': 'Forward', 'C': 'Center',
+    'G-F': 'Guard-Forward', 'F-G': 'Forward-Guard',
+    'F-C': 'Forward-Center', 'C-F': 'Center-Forward',
+}
+
+# Every CommonPlayerInfo field -> PlayerDetails column (PERSON_ID is the key)
+DETAIL_FIELDS = {
+    'FIRST_NAME': 'first_name', 'LAST_NAME': 'last_name',
+    'DISPLAY_FIRST_LAST': 'display_first_last', 'DISPLAY_LAST_COMMA_FIRST': 'display_last_comma_first',
+    'DISPLAY_FI_LAST': 'display_fi_last', 'PLAYER_SLUG': 'player_slug', 'BIRTHDATE': 'birthdate',
+    'SCHOOL': 'school', 'COUNTRY': 'country', 'LAST_AFFILIATION': 'last_affiliation',
+    'HEIGHT': 'height', 'WEIGHT': 'weight', 'SEASON_EXP': 'season_exp', 'JERSEY': 'jersey',
+    'POSITION': 'position', 'ROSTERSTATUS': 'roster_status', 'TEAM_ID': 'team_id',
+    'TEAM_NAME': 'team_name', 'TEAM_ABBREVIATION': 'team_abbreviation', 'TEAM_CODE': 'team_code',
+    'TEAM_CITY': 'team_city', 'PLAYERCODE': 'player_code', 'FROM_YEAR': 'from_year',
+    'TO_YEAR': 'to_year', 'DLEAGUE_FLAG': 'dleague_flag', 'NBA_FLAG': 'nba_flag',
+    'GAMES_PLAYED_FLAG': 'games_played_flag', 'DRAFT_YEAR': 'draft_year',
+    'DRAFT_ROUND': 'draft_round', 'DRAFT_NUMBER': 'draft_number',
+}
+
+# PlayerHeadlineStats field -> column (PLAYER_ID/PLAYER_NAME are already known)
+HEADLINE_FIELDS = {'TimeFrame': 'time_frame', 'PTS': 'pts', 'AST': 'ast', 'REB': 'reb', 'PIE': 'pie'}
+
+# Position bitmask bits (Players.pos_mask)
+POS_GUARD = 1
+POS_FORWARD = 2
+POS_CENTER = 4
+POSITION_BITS = {'Guard': POS_GUARD, 'Forward': POS_FORWARD, 'Center': POS_CENTER}
+
+
+def result_set(payload, name):
+    """(headers, rows) of the named result set in a stats payload."""
+    result_sets = payload.get('resultSets', payload.get('resultSet'))
+    if isinstance(result_sets, dict):
+        result_sets = [result_sets]
+    for rs in result_sets or ():
+        if rs['name'] == name:
+            return rs['headers'], rs['rowSet']
+    raise KeyError(f"Result set {name} missing from response")
+
+
+def parse_player_info(payload):
+    """Record with the PLAYER_FIELDS of the first CommonPlayerInfo row."""
+    headers, rows = result_set(payload, 'CommonPlayerInfo')
+    if not rows:
+        raise ValueError("CommonPlayerInfo response has no rows")
+    row = rows[0]
+    positions = {header: i for i, header in enumerate(headers)}
+    return {key: row[positions[field]] for field, key in PLAYER_FIELDS.items()}
+
+
+def parse_team_roster(payload):
+    """Records with the ROSTER_FIELDS of every CommonTeamRoster row."""
+    headers, rows = result_set(payload, 'CommonTeamRoster')
+    positions = {header: i for i, header in enumerate(headers)}
+    fields = [(positions[field], key) for field, key in ROSTER_FIELDS.items()]
+    records = []
+    for row in rows:
+        record = {key: row[i] for i, key in fields}
+        record['pos'] = ROSTER_POSITIONS.get(record['pos'], record['pos'])
+        records.append(record)
+    return records
+
+
+def _split_fields(headers, row, fields, skip=()):
+    """(known columns, leftover fields) of one result-set row."""
+    known = dict.fromkeys(fields.values())
+    extra = {}
+    for header, value in zip(headers, row):
+        if header in fields:
+            known[fields[header]] = value
+        elif header not in skip:
+            extra[header] = value
+    return known, extra
+
+
+def parse_player_details(payload):
+    """Everything else in a CommonPlayerInfo payload, so nothing needs re-crawling.
+
+    Returns {'info': PlayerDetails columns, 'info_extra': unknown fields,
+    'headlines': [(columns, unknown fields)], 'available_seasons': [...]}.
+    Fields the API adds later land in the *extra dicts instead of being lost.
+    """
+    headers, rows = result_set(payload, 'CommonPlayerInfo')
+    if not rows:
+        raise ValueError("CommonPlayerInfo response has no rows")
+    info, info_extra = _split_fields(headers, rows[0], DETAIL_FIELDS, skip=('PERSON_ID',))
+
+    headlines = []
+    try:
+        headers, rows = result_set(payload, 'PlayerHeadlineStats')
+    except KeyError:
+        rows = []
+    for row in rows:
+        headlines.append(_split_fields(headers, row, HEADLINE_FIELDS, skip=('PLAYER_ID', 'PLAYER_NAME')))
+
+    try:
+        _, rows = result_set(payload, 'AvailableSeasons')
+    except KeyError:
+        rows = []
+    return {'info': info, 'info_extra': info_extra, 'headlines': headlines,
+            'available_seasons': [row[0] for row in rows]}
+
+
+def parse_int(value):
+    """Integer from an API string such as '23' or '250'; None for '' and the like."""
+    if isinstance(value, int):
+        return value
+    text = str(value) if value is not None else ''
+    return int(text) if text.isdigit() else None
+
+
+def parse_height(height):
+    """Inches from a feet-inches string: '6-7' -> 79."""
+    feet, sep, inches = str(height or '').partition('-')
+    if sep and feet.isdigit() and inches.isdigit():
+        return int(feet) * 12 + int(inches)
+    return None
+
+
+def position_mask(pos):
+    """POS_* bits for a position string: 'Guard-Forward' -> POS_GUARD | POS_FORWARD."""
+    return sum(bit for name, bit in POSITION_BITS.items() if name in (pos or ''))
+
+
+# Letters NFKD leaves alone, and punctuation names are written with and without
+_FOLD_TABLE = str.maketrans({'ø': 'o', 'đ': 'd', 'ł': 'l', 'ħ': 'h', 'ı': 'i', 'æ': 'ae', 'œ': 'oe',
+                             'þ': 'th', "'": None, '’': None, '.': None, '-': ' ', ',': ' '})
+
+
+def fold_name(name):
+    """Lowercase, accent-free form of a name for search: 'Nikola Jokić' -> 'nikola jokic'."""
+    text = (name or '').casefold()
+    if not text.isascii():
+        text = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    return ' '.join(text.translate(_FOLD_TABLE).split())
+
+
+def typed_player_columns(jersey_num, pos, height, weight, is_active):
+    """(height_in, weight_lbs, jersey, active, pos_mask) for a Players row."""
+    return (parse_height(height), parse_int(weight), parse_int(jersey_num),
+            int(is_active == 'Active'), position_mask(pos))
@@ -0,0 +1,86 @@
+from PlayerInfoParser import POSITION_BITS, fold_name
+
+# Columns PlayerTable and MyTeamManager display, in their tuple order
+DISPLAY_COLUMNS = ['player_id', 'full_name', 'jersey_num', 'team_name', 'team_ab',
+                   'pos', 'height', 'weight', 'country', 'is_active']
+
+
+def _masks_with(bit):
+    # pos_mask values containing `bit`, so the filter is an indexable IN (...)
+    return [mask for mask in range(1, 8) if mask & bit]
+
+
+class PlayerQuery:
+    """Compiles the PlayerDisplayApp filters into one parameterised SQL query.
+
+    Every filter maps onto an indexed column (team via Teams.team_nickname,
+    position via the pos_mask bits, active via the 0/1 flag), only the
+    displayed columns are read, and pages are fetched by keyset on player_id
+    instead of OFFSET, so no page costs more than its own rows.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def compile(self, name=None, team=None, position=None, country=None, active_only=False):
+        """(WHERE clause, parameters) for the given filters. None / "All" means no filter."""
+        clauses, params = [], []
+        name = fold_name(name)
+        if name:
+            clauses.append("name_folded LIKE ? ESCAPE '\\'")
+            escaped = name.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            params.append(f"%{escaped}%")
+        if team and team != "All":
+            clauses.append("team_ab IN (SELECT team_ab FROM Teams WHERE team_nickname = ?)")
+            params.append(team)
+        if position and position != "All":
+            masks = _masks_with(POSITION_BITS[position])
+            clauses.append(f"pos_mask IN ({','.join('?' * len(masks))})")
+            params.extend(masks)
+        if country and country != "All":
+            clauses.append("country = ?")
+            params.append(country)
+        if active_only:
+            clauses.append("active = 1")
+        return (" AND ".join(clauses) or "1"), params
+
+    def count(self, **filters):
+        where, params = self.compile(**filters)
+        return self.db.execute(f"SELECT COUNT(*) FROM Players WHERE {where}", params).fetchone()[0]
+
+    def page(self, after=None, limit=10, **filters):
+        """Up to `limit` matching players with player_id > `after`, in player_id order.
+
+        Pass the last player_id of one page as `after` to get the next.
+        """
+        where, params = self.compile(**filters)
+        if after is not None:
+            where += " AND player_id > ?"
+            params.append(after)
+        return self.db.execute(
+            f"SELECT {', '.join(DISPLAY_COLUMNS)} FROM Players WHERE {where} "
+            f"ORDER BY player_id LIMIT ?", params + [limit]).fetchall()
+
+    def rows(self, player_ids):
+        """Display rows for the given players, in player_id order."""
+        if not player_ids:
+            return []
+        return self.db.execute(
+            f"SELECT {', '.join(DISPLAY_COLUMNS)} FROM Players "
+            f"WHERE player_id IN ({','.join('?' * len(player_ids))}) ORDER BY player_id",
+            list(player_ids)).fetchall()
+
+    def team_nicknames(self):
+        return [nickname for (nickname,) in self.db.execute(
+            "SELECT DISTINCT team_nickname FROM Teams ORDER BY team_nickname")]
+
+    def positions(self):
+        """Position tokens some player has, in POSITION_BITS order."""
+        present = 0
+        for (mask,) in self.db.execute("SELECT DISTINCT pos_mask FROM Players"):
+            present |= mask or 0
+        return [name for name, bit in POSITION_BITS.items() if present & bit]
+
+    def countries(self):
+        return [country for (country,) in self.db.execute(
+            "SELECT DISTINCT country FROM Players WHERE country <> '' ORDER BY country")]
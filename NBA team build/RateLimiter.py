@@ -0,0 +1,42 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every fetch worker.
+
+    Tokens refill at `rate` per second up to `capacity`. A rate of None or 0
+    disables limiting entirely.
+    """
+
+    def __init__(self, rate, capacity=1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.clock = clock
+        self.sleep = sleep
+
+        self.tokens = float(self.capacity)
+        self.last_refill = self.clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        elapsed = now - self.last_refill
+        self.last_refill = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available. Returns the time spent waiting."""
+        if not self.rate:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                wait = (tokens - self.tokens) / self.rate
+            self.sleep(wait)
+            waited += wait
@@ -0,0 +1,128 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+DAY = 86400
+
+
+class CacheMiss(Exception):
+    """Raised in offline mode when a response isn't cached."""
+
+
+class ResponseCache:
+    """Disk-backed cache of raw nba_api responses.
+
+    Entries are keyed by endpoint name + parameters and stored zlib-compressed
+    in their own SQLite file. Each endpoint has a TTL; once the cache grows
+    past `max_bytes` the least recently used entries are evicted. With
+    `offline=True` nothing is fetched: every response comes from the cache,
+    expired or not, and anything missing raises CacheMiss.
+    """
+
+    DEFAULT_TTLS = {
+        'commonplayerinfo': 7 * DAY,
+    }
+
+    def __init__(self, path='nba_cache.db', ttls=None, default_ttl=DAY,
+                 max_bytes=256 * 1024 * 1024, offline=False, compress_level=6):
+        self.path = path
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.compress_level = compress_level
+
+        self.hits = 0
+        self.misses = 0
+
+        # Shared by fetch workers, so one connection behind a lock
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=OFF")  # it's a cache; losing the tail is fine
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS Responses (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_access ON Responses (last_access);
+        ''')
+        self.total_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM Responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint, params):
+        return f"{endpoint.lower()}?{json.dumps(params, sort_keys=True, default=str)}"
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint.lower(), self.default_ttl)
+
+    def get(self, endpoint, params):
+        """Return the cached payload, or None if missing (or expired when online)."""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT fetched_at, payload FROM Responses WHERE key = ?", (key,)).fetchone()
+            if row is None or (not self.offline and now - row[0] > self.ttl_for(endpoint)):
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE Responses SET last_access = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[1]))
+
+    def put(self, endpoint, params, payload):
+        key = self.make_key(endpoint, params)
+        blob = zlib.compress(json.dumps(payload).encode('utf-8'), self.compress_level)
+        now = time.time()
+        with self.lock:
+            old = self.db.execute("SELECT size FROM Responses WHERE key = ?", (key,)).fetchone()
+            self.db.execute(
+                "INSERT OR REPLACE INTO Responses VALUES (?,?,?,?,?,?)",
+                (key, endpoint.lower(), now, now, len(blob), blob))
+            self.total_bytes += len(blob) - (old[0] if old else 0)
+            self._evict()
+            self.db.commit()
+
+    def fetch(self, endpoint, params, loader, validate=None):
+        """Serve from cache, otherwise call `loader()` and cache its payload.
+
+        `validate(payload)` runs before anything is stored and should raise on a
+        malformed response, so a bad payload is never cached: the error reaches
+        the caller and a retry goes back to the network instead of replaying it.
+        """
+        payload = self.get(endpoint, params)
+        if payload is not None:
+            return payload
+        if self.offline:
+            raise CacheMiss(f"{endpoint} {params} is not cached")
+        payload = loader()
+        if validate is not None:
+            validate(payload)
+        self.put(endpoint, params, payload)
+        return payload
+
+    def _evict(self):
+        """Drop least recently used entries until under max_bytes. Caller holds the lock."""
+        while self.total_bytes > self.max_bytes:
+            rows = self.db.execute(
+                "SELECT key, size FROM Responses ORDER BY last_access LIMIT 100").fetchall()
+            if not rows:
+                self.total_bytes = 0
+                break
+            for key, size in rows:
+                self.db.execute("DELETE FROM Responses WHERE key = ?", (key,))
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
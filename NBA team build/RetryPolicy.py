@@ -0,0 +1,218 @@
+import json
+import logging
+import random
+import socket
+import threading
+import time
+from collections import deque
+from requests.exceptions import ReadTimeout, ConnectionError, Timeout
+from ResponseCache import CacheMiss
+
+log = logging.getLogger(__name__)
+
+# Error classes
+TIMEOUT = 'timeout'
+THROTTLE = 'throttle'
+PERMANENT = 'permanent'
+PARSE = 'parse'
+OFFLINE = 'offline'
+BUDGET = 'budget'
+UNKNOWN = 'unknown'
+
+RETRYABLE = (TIMEOUT, THROTTLE, PARSE)
+SERVICE_TROUBLE = (TIMEOUT, THROTTLE)  # what the circuit breaker counts as failure
+
+
+def _status_code(exc):
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None)
+    return status if status is not None else getattr(exc, 'status_code', None)
+
+
+def classify_error(exc):
+    """Map an exception from a stats request to one of the error classes above."""
+    if isinstance(exc, CacheMiss):
+        return OFFLINE
+    status = _status_code(exc)
+    if status in (403, 429):
+        return THROTTLE  # stats.nba.com answers throttled clients with either
+    if status is not None and status >= 500:
+        return TIMEOUT  # server trouble: retry like a timeout
+    if status is not None and status >= 400:
+        return PERMANENT
+    if isinstance(exc, (ReadTimeout, Timeout, ConnectionError, socket.timeout, TimeoutError)):
+        return TIMEOUT
+    if isinstance(exc, (json.JSONDecodeError, ValueError, KeyError, IndexError, TypeError)):
+        return PARSE
+    return UNKNOWN
+
+
+class Backoff:
+    """Exponential backoff with decorrelated jitter.
+
+    Each delay is drawn from [base, previous * 3], capped at `cap`.
+    """
+
+    def __init__(self, base=1.0, cap=60.0, rng=random.uniform):
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+
+    def next_delay(self, previous=None):
+        upper = max(self.base, (previous or self.base) * 3)
+        return min(self.cap, self.rng(self.base, upper))
+
+    def for_attempt(self, attempt):
+        """Delay before attempt `attempt + 1` when the previous delay wasn't kept."""
+        delay = None
+        for _ in range(max(1, attempt)):
+            delay = self.next_delay(delay)
+        return delay
+
+
+class CircuitBreaker:
+    """Pauses every worker when the recent failure rate spikes.
+
+    Looks at outcomes from the last `window` seconds. Once at least
+    `min_samples` are in and `failure_threshold` of them failed, the breaker
+    opens for `cooldown` seconds; each consecutive trip doubles the cooldown,
+    up to `max_cooldown`. A success after reopening resets it.
+    """
+
+    def __init__(self, failure_threshold=0.5, min_samples=10, window=60.0,
+                 cooldown=30.0, max_cooldown=600.0, clock=time.monotonic, sleep=time.sleep):
+        self.failure_threshold = failure_threshold
+        self.min_samples = min_samples
+        self.window = window
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self.sleep = sleep
+
+        self.outcomes = deque()  # (time, ok)
+        self.open_until = 0.0
+        self.trips = 0
+        self.lock = threading.Lock()
+
+    def _trim(self, now):
+        while self.outcomes and now - self.outcomes[0][0] > self.window:
+            self.outcomes.popleft()
+
+    def record(self, ok):
+        with self.lock:
+            now = self.clock()
+            if ok:
+                self.cooldown = self.base_cooldown
+            self.outcomes.append((now, ok))
+            self._trim(now)
+            if now < self.open_until or len(self.outcomes) < self.min_samples:
+                return
+            failures = sum(1 for _, success in self.outcomes if not success)
+            if failures / len(self.outcomes) >= self.failure_threshold:
+                self.open_until = now + self.cooldown
+                self.trips += 1
+                log.warning("Circuit breaker open: %d/%d recent requests failed, pausing for %.0fs.",
+                            failures, len(self.outcomes), self.cooldown)
+                self.cooldown = min(self.max_cooldown, self.cooldown * 2)
+                self.outcomes.clear()
+
+    def is_open(self):
+        return self.clock() < self.open_until
+
+    def wait(self, deadline=None):
+        """Block while the breaker is open. Returns False if `deadline` came first."""
+        while True:
+            with self.lock:
+                remaining = self.open_until - self.clock()
+            if remaining <= 0:
+                return True
+            if deadline is not None and self.clock() + remaining > deadline:
+                return False
+            self.sleep(remaining)
+
+
+class RetryPolicy:
+    """The retry rules shared by NBADataCollector and PlayerCollectionRetry.
+
+    Combines per-request retries with decorrelated-jitter backoff, error
+    classification, a global circuit breaker and an optional per-run time
+    budget (`budget_seconds`).
+    """
+
+    def __init__(self, max_retries=3, backoff=None, breaker=None, budget_seconds=None,
+                 clock=time.monotonic, sleep=time.sleep, metrics=None):
+        self.max_retries = max_retries
+        self.backoff = backoff or Backoff(base=2.0, cap=60.0)
+        self.breaker = breaker or CircuitBreaker(clock=clock, sleep=sleep)
+        self.clock = clock
+        self.sleep = sleep
+        self.deadline = None
+        self.budget_seconds = budget_seconds
+        self.metrics = metrics  # optional MetricsRegistry
+        self.start_budget()
+
+    def start_budget(self):
+        """(Re)start the run's time budget."""
+        self.deadline = self.clock() + self.budget_seconds if self.budget_seconds else None
+
+    def budget_exhausted(self):
+        return self.deadline is not None and self.clock() >= self.deadline
+
+    def before_attempt(self):
+        """Wait out an open breaker. Returns False if the time budget ran out instead."""
+        if self.budget_exhausted():
+            return False
+        if not self.breaker.is_open():
+            return True
+        start = self.clock()
+        ready = self.breaker.wait(self.deadline)
+        if self.metrics is not None:
+            self.metrics.counter('nba_breaker_wait_seconds_total',
+                                 'Time workers spent paused by the circuit breaker').inc(self.clock() - start)
+        return ready
+
+    def record(self, ok, error_class=None):
+        if ok or error_class in SERVICE_TROUBLE:
+            self.breaker.record(ok)
+
+    def should_retry(self, error_class, attempt):
+        return (error_class in RETRYABLE and attempt < self.max_retries
+                and not self.budget_exhausted())
+
+    def sleep_before_retry(self, previous_delay=None):
+        """Back off before the next attempt; returns the delay used."""
+        delay = self.backoff.next_delay(previous_delay)
+        if self.deadline is not None:
+            delay = max(0.0, min(delay, self.deadline - self.clock()))
+        if self.metrics is not None:
+            self.metrics.counter('nba_retry_sleep_seconds_total', 'Time spent backing off between attempts').inc(delay)
+        self.sleep(delay)
+        return delay
+
+    def _count_attempt(self, result):
+        if self.metrics is not None:
+            self.metrics.counter('nba_api_attempts_total', 'Request attempts by outcome (ok or error class)',
+                                 ('result',)).inc(result=result)
+
+    def call(self, func, *args, **kwargs):
+        """Run `func` under the policy. Returns (result, error_class, error message)."""
+        delay = None
+        error_class, message = None, None
+        for attempt in range(1, self.max_retries + 1):
+            if not self.before_attempt():
+                return None, BUDGET, "time budget exhausted"
+            try:
+                result = func(*args, **kwargs)
+                self.record(True)
+                self._count_attempt('ok')
+                return result, None, None
+            except Exception as e:
+                error_class, message = classify_error(e), str(e)
+                self.record(False, error_class)
+                self._count_attempt(error_class)
+                log.debug("[Attempt %d/%d] %s error: %s", attempt, self.max_retries, error_class, e)
+                if not self.should_retry(error_class, attempt):
+                    break
+                delay = self.sleep_before_retry(delay)
+        return None, error_class, message
@@ -0,0 +1,43 @@
+class RosterIndex:
+    """Keyed view of nba_api's static player list, built once per run.
+
+    Maps player ID -> (full name, active flag) so ingestion can look up a
+    player's static metadata in O(1) instead of scanning the whole list.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = dict(entries or {})  # player_id -> (full_name, is_active)
+
+    @classmethod
+    def from_static(cls, static_players):
+        """Build from `players.get_players()` style dicts."""
+        return cls((p['id'], (p['full_name'], bool(p['is_active']))) for p in static_players)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, player_id):
+        return player_id in self.entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def name(self, player_id, default=None):
+        entry = self.entries.get(player_id)
+        return entry[0] if entry else default
+
+    def is_active(self, player_id):
+        entry = self.entries.get(player_id)
+        return entry[1] if entry else None
+
+    def status(self, player_id, default="Unknown"):
+        """Active flag in the form stored in Players.is_active."""
+        entry = self.entries.get(player_id)
+        if entry is None:
+            return default
+        return 'Active' if entry[1] else 'Not Active'
+
+    def statuses(self):
+        """(player_id, status) pairs in roster order."""
+        return [(pid, 'Active' if active else 'Not Active')
+                for pid, (_, active) in self.entries.items()]
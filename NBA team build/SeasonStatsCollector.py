@@ -0,0 +1,114 @@
+import argparse
+import logging
+import time
+from PlayerInfoParser import result_set
+from StatsClient import league_player_stats_parameters, request_stats
+
+log = logging.getLogger(__name__)
+
+# LeagueDashPlayerStats header -> PlayerSeasonStats column
+STAT_COLUMNS = {
+    'TEAM_ID': 'team_id', 'TEAM_ABBREVIATION': 'team_ab', 'AGE': 'age',
+    'GP': 'gp', 'W': 'w', 'L': 'l', 'MIN': 'min', 'PTS': 'pts',
+    'REB': 'reb', 'OREB': 'oreb', 'DREB': 'dreb', 'AST': 'ast', 'STL': 'stl',
+    'BLK': 'blk', 'TOV': 'tov', 'PF': 'pf', 'FGM': 'fgm', 'FGA': 'fga',
+    'FG_PCT': 'fg_pct', 'FG3M': 'fg3m', 'FG3A': 'fg3a', 'FG3_PCT': 'fg3_pct',
+    'FTM': 'ftm', 'FTA': 'fta', 'FT_PCT': 'ft_pct', 'PLUS_MINUS': 'plus_minus',
+}
+
+_COLUMNS = ['player_id', 'season', 'season_type'] + list(STAT_COLUMNS.values()) + ['fetched_at']
+
+SEASON_STATS_UPSERT = f'''
+    INSERT INTO PlayerSeasonStats ({", ".join(_COLUMNS)})
+    VALUES ({",".join("?" * len(_COLUMNS))})
+    ON CONFLICT(player_id, season, season_type) DO UPDATE SET
+        {", ".join(f"{c} = excluded.{c}" for c in _COLUMNS[3:])}
+'''
+
+
+def season_string(start_year):
+    """2023 -> '2023-24'."""
+    return f"{start_year}-{str(start_year + 1)[-2:]}"
+
+
+class SeasonStatsCollector:
+    """Season stats for every player via LeagueDashPlayerStats.
+
+    One request returns the whole league's season totals, so a season costs a
+    single call instead of a per-player crawl. Requests go through the
+    collector's rate limiter, retry policy and response cache, and rows are
+    bulk-upserted into PlayerSeasonStats through its batch writer.
+    """
+
+    ENDPOINT = 'leaguedashplayerstats'
+
+    def __init__(self, collector, season_type='Regular Season'):
+        self.collector = collector
+        self.season_type = season_type
+
+    def fetch_season(self, season):
+        """Raw payload for one season, from the cache when possible."""
+        parameters = league_player_stats_parameters(season, self.season_type)
+
+        def load():
+            # Same rate limit and latency metrics as the per-player requests
+            self.collector._rate_limit()
+            with self.collector._api_timer(self.ENDPOINT):
+                return request_stats(self.ENDPOINT, parameters)
+
+        def request():
+            if self.collector.cache is None:
+                return load()
+            return self.collector.cache.fetch(self.ENDPOINT, parameters, load,
+                                              lambda payload: result_set(payload, 'LeagueDashPlayerStats'))
+
+        payload, error_class, error = self.collector.retry_policy.call(request)
+        if payload is None:
+            raise RuntimeError(f"Season {season} stats failed ({error_class}): {error}")
+        return payload
+
+    def parse_season(self, payload, season, fetched_at=None):
+        """PlayerSeasonStats rows from a LeagueDashPlayerStats payload."""
+        headers, rows = result_set(payload, 'LeagueDashPlayerStats')
+        positions = {header: i for i, header in enumerate(headers)}
+        player_pos = positions['PLAYER_ID']
+        stat_pos = [positions.get(header) for header in STAT_COLUMNS]
+        fetched_at = fetched_at or time.time()
+        return [
+            (row[player_pos], season, self.season_type,
+             *(row[i] if i is not None else None for i in stat_pos), fetched_at)
+            for row in rows
+        ]
+
+    def collect_season(self, season):
+        rows = self.parse_season(self.fetch_season(season), season)
+        writer = self.collector.writer
+        for row in rows:
+            writer.add(SEASON_STATS_UPSERT, row)
+        writer.flush()
+        log.info("Stored %s %s stats for %d players.", season, self.season_type, len(rows))
+        return len(rows)
+
+    def collect_seasons(self, seasons):
+        return sum(self.collect_season(season) for season in seasons)
+
+
+def main():
+    from NBADataCollector import NBADataCollector
+
+    parser = argparse.ArgumentParser(description="Bulk-load league-wide season stats.")
+    parser.add_argument("seasons", nargs="+", help="seasons like 2023-24, or start years like 2023")
+    parser.add_argument("--db", default="nba_info.db")
+    parser.add_argument("--season-type", default="Regular Season")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    seasons = [s if "-" in s else season_string(int(s)) for s in args.seasons]
+    collector = NBADataCollector(args.db)
+    SeasonStatsCollector(collector, args.season_type).collect_seasons(seasons)
+    collector.close()
+
+
+if __name__ == "__main__":
+    main()
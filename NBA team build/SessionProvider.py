@@ -0,0 +1,73 @@
+import itertools
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from nba_api.stats.library.http import NBAStatsHTTP, STATS_HEADERS
+
+
+class CountingAdapter(HTTPAdapter):
+    """HTTPAdapter that counts how many requests each pooled connection served."""
+
+    def __init__(self, **kwargs):
+        self.served = {}  # connection serial -> requests served
+        self._serials = itertools.count(1)
+        self._lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        connection = getattr(response.raw, 'connection', None)
+        if connection is not None:
+            with self._lock:
+                serial = getattr(connection, '_pool_serial', None)
+                if serial is None:
+                    serial = connection._pool_serial = next(self._serials)
+                self.served[serial] = self.served.get(serial, 0) + 1
+        return response
+
+
+class SessionProvider:
+    """Keep-alive requests.Session shared by every nba_api stats call.
+
+    The connection pool holds `pool_size` connections per host, so with one
+    slot per fetch worker no connection is ever thrown away (requests' default
+    pool keeps 10, and every worker past that pays a fresh TCP/TLS handshake
+    per request). Responses are negotiated as gzip/deflate; nba_api also asks
+    for brotli, which requests can only decode when the brotli package is
+    installed.
+    """
+
+    def __init__(self, pool_size=10, accept_encoding='gzip, deflate'):
+        self.pool_size = max(1, pool_size)
+        self.accept_encoding = accept_encoding
+        self.adapter = CountingAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+    def install(self):
+        """Route nba_api's stats requests (and StatsClient) through this session."""
+        NBAStatsHTTP.set_session(self.session)
+        NBAStatsHTTP.headers = dict(STATS_HEADERS, **{'Accept-Encoding': self.accept_encoding})
+        return self
+
+    def stats(self):
+        with self.adapter._lock:
+            served = list(self.adapter.served.values())
+        requests_sent = sum(served)
+        return {
+            'connections': len(served),
+            'requests': requests_sent,
+            'reused': requests_sent - len(served),
+            'max_per_connection': max(served, default=0),
+            'per_connection': requests_sent / len(served) if served else 0.0,
+        }
+
+    def report(self):
+        s = self.stats()
+        return (f"HTTP pool: {s['requests']} requests over {s['connections']} connections "
+                f"({s['reused']} reused, {s['per_connection']:.1f} per connection, "
+                f"max {s['max_per_connection']})")
+
+    def close(self):
+        self.session.close()
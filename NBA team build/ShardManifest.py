@@ -0,0 +1,58 @@
+import json
+import os
+
+
+class ShardManifest:
+    """Splits the player-ID space into `count` shards, one SQLite file each.
+
+    A player belongs to shard `player_id % count`. The manifest is a small JSON
+    file, so every worker process or machine sees the same split:
+
+        {"count": 4, "shards": [{"index": 0, "db": "nba_info.shard0.db"}, ...]}
+
+    Relative DB paths are taken relative to the manifest.
+    """
+
+    def __init__(self, count, db_paths, path=None):
+        if count < 1 or len(db_paths) != count:
+            raise ValueError(f"Shard manifest needs {count} DB paths, got {len(db_paths)}")
+        self.count = count
+        self.db_paths = list(db_paths)
+        self.path = path
+
+    @classmethod
+    def create(cls, path, count, db_pattern='nba_info.shard{index}.db'):
+        manifest = cls(count, [db_pattern.format(index=i) for i in range(count)], path)
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            data = json.load(f)
+        shards = sorted(data['shards'], key=lambda s: s['index'])
+        return cls(data['count'], [s['db'] for s in shards], path)
+
+    def save(self, path=None):
+        self.path = path or self.path
+        with open(self.path, 'w') as f:
+            json.dump({'count': self.count, 'shards': [
+                {'index': i, 'db': db} for i, db in enumerate(self.db_paths)
+            ]}, f, indent=2)
+
+    def db_path(self, index):
+        path = self.db_paths[index]
+        if self.path and not os.path.isabs(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(self.path)), path)
+        return path
+
+    def shard(self, index):
+        """(index, count) pair for NBADataCollector(shard=...)."""
+        if not 0 <= index < self.count:
+            raise ValueError(f"Shard {index} out of range 0..{self.count - 1}")
+        return index, self.count
+
+
+def in_shard(player_id, shard):
+    """True when `player_id` belongs to `shard`, an (index, count) pair or None (everything)."""
+    return shard is None or player_id % shard[1] == shard[0]
@@ -0,0 +1,123 @@
+import argparse
+import logging
+import sqlite3
+from DatabaseSchema import migrate
+from ShardManifest import ShardManifest
+
+log = logging.getLogger(__name__)
+
+# Folds shard DBs written by `NBADataCollector --manifest ... --shard N` into
+# the main DB. Player rows conflict-resolve by PlayerSync.last_fetched, details
+# and stats by fetched_at: the newer fetch wins, whichever side it is on.
+
+
+def _columns(db, table):
+    return [row[1] for row in db.execute(f'PRAGMA main.table_info("{table}")')]
+
+
+def _upsert_sql(table, columns, key, select, newer=None):
+    """INSERT ... SELECT upsert; with `newer`, only rows passing it replace existing ones."""
+    updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c not in key)
+    return (f'INSERT INTO main."{table}" ({", ".join(columns)}) {select} '
+            f'ON CONFLICT({", ".join(key)}) DO UPDATE SET {updates}'
+            + (f' WHERE {newer}' if newer else ''))
+
+
+def merge_shard(db, shard_path):
+    """Merge one shard DB into `db` in a single transaction. Returns rows taken per table."""
+    shard = sqlite3.connect(shard_path)
+    migrate(shard)  # an older shard gets the same columns as the main DB
+    shard.close()
+
+    db.execute("ATTACH DATABASE ? AS shard", (shard_path,))
+    try:
+        counts = {}
+        with db:
+            players = _columns(db, 'Players')
+            # Players and history first: they compare against the main DB's sync times
+            select = (f'SELECT {", ".join("p." + c for c in players)} FROM shard.Players p '
+                      'LEFT JOIN shard.PlayerSync s ON s.player_id = p.player_id '
+                      'LEFT JOIN main.PlayerSync m ON m.player_id = p.player_id '
+                      'WHERE m.player_id IS NULL OR COALESCE(s.last_fetched, 0) > m.last_fetched')
+            counts['Players'] = db.execute(_upsert_sql('Players', players, ['player_id'],
+                                                       select)).rowcount
+
+            # The shard's current version of every player taken above, unless the main DB
+            # already holds the same content; the insert trigger closes the old version
+            history = [c for c in _columns(db, 'PlayerHistory') if c not in ('version_id', 'valid_from')]
+            counts['PlayerHistory'] = db.execute(
+                f'INSERT INTO main.PlayerHistory (valid_from, {", ".join(history)}) '
+                f'SELECT MAX(h.valid_from, COALESCE(m.valid_from, 0)), {", ".join("h." + c for c in history)} '
+                'FROM shard.PlayerHistory h '
+                'LEFT JOIN shard.PlayerSync s ON s.player_id = h.player_id '
+                'LEFT JOIN main.PlayerSync ms ON ms.player_id = h.player_id '
+                'LEFT JOIN main.PlayerHistory m ON m.player_id = h.player_id AND m.valid_to IS NULL '
+                'WHERE h.valid_to IS NULL '
+                'AND (ms.player_id IS NULL OR COALESCE(s.last_fetched, 0) > ms.last_fetched) '
+                'AND h.content_hash IS NOT m.content_hash').rowcount
+
+            sync = _columns(db, 'PlayerSync')
+            counts['PlayerSync'] = db.execute(_upsert_sql(
+                'PlayerSync', sync, ['player_id'], f'SELECT {", ".join(sync)} FROM shard.PlayerSync WHERE true',
+                'excluded.last_fetched > PlayerSync.last_fetched')).rowcount
+
+            teams = _columns(db, 'Teams')
+            counts['Teams'] = db.execute(_upsert_sql(
+                'Teams', teams, ['team_id'], f'SELECT {", ".join(teams)} FROM shard.Teams WHERE true')).rowcount
+
+            details = _columns(db, 'PlayerDetails')
+            counts['PlayerDetails'] = db.execute(_upsert_sql(
+                'PlayerDetails', details, ['player_id'],
+                f'SELECT {", ".join(details)} FROM shard.PlayerDetails WHERE true',
+                'excluded.fetched_at > PlayerDetails.fetched_at')).rowcount
+
+            headlines = _columns(db, 'PlayerHeadlineStats')
+            counts['PlayerHeadlineStats'] = db.execute(_upsert_sql(
+                'PlayerHeadlineStats', headlines, ['player_id', 'time_frame'],
+                f'SELECT {", ".join(headlines)} FROM shard.PlayerHeadlineStats WHERE true',
+                'excluded.fetched_at > PlayerHeadlineStats.fetched_at')).rowcount
+
+            stats = _columns(db, 'PlayerSeasonStats')
+            counts['PlayerSeasonStats'] = db.execute(_upsert_sql(
+                'PlayerSeasonStats', stats, ['player_id', 'season', 'season_type'],
+                f'SELECT {", ".join(stats)} FROM shard.PlayerSeasonStats WHERE true',
+                'excluded.fetched_at > PlayerSeasonStats.fetched_at')).rowcount
+    finally:
+        db.execute("DETACH DATABASE shard")
+
+    unfinished = sqlite3.connect(shard_path).execute(
+        "SELECT COUNT(*) FROM PlayerJobs WHERE state <> 'done'").fetchone()[0]
+    log.info("Merged %s: %s%s", shard_path, ", ".join(f"{n} {t}" for t, n in counts.items()),
+             f" ({unfinished} jobs unfinished in that shard)" if unfinished else "")
+    return counts
+
+
+def merge_shards(db, shard_paths):
+    migrate(db)
+    for path in shard_paths:
+        merge_shard(db, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge shard DBs into the main player DB.")
+    parser.add_argument("shards", nargs="*", help="shard DB files (or use --manifest)")
+    parser.add_argument("--manifest", help="shard manifest listing the shard DBs")
+    parser.add_argument("--db", default="nba_info.db")
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    paths = list(args.shards)
+    if args.manifest:
+        manifest = ShardManifest.load(args.manifest)
+        paths += [manifest.db_path(i) for i in range(manifest.count)]
+    if not paths:
+        parser.error("no shard DBs given")
+
+    db = sqlite3.connect(args.db)
+    merge_shards(db, paths)
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
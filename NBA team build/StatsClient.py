@@ -0,0 +1,55 @@
+from nba_api.stats.library.http import NBAStatsHTTP
+
+# Talks to stats.nba.com through nba_api's HTTP layer only. Importing
+# nba_api.stats.endpoints would pull in pandas, which ingestion doesn't need.
+
+
+class StatsHTTPError(Exception):
+    """Non-2xx answer from the stats API; `status_code` drives retry classification."""
+
+    def __init__(self, status_code, url):
+        super().__init__(f"HTTP {status_code} from {url}")
+        self.status_code = status_code
+        self.url = url
+
+
+def request_stats(endpoint, parameters, timeout=60):
+    """Call a stats endpoint and return its decoded JSON payload."""
+    response = NBAStatsHTTP().send_api_request(
+        endpoint=endpoint, parameters=parameters, timeout=timeout)
+    status = response._status_code
+    if status is not None and status >= 400:
+        raise StatsHTTPError(status, response.get_url())
+    return response.get_dict()
+
+
+def request_common_player_info(player_id, timeout=60):
+    """Raw CommonPlayerInfo payload, same parameters as nba_api's endpoint class."""
+    return request_stats('commonplayerinfo', {'PlayerID': player_id, 'LeagueID': ''}, timeout)
+
+
+def request_team_roster(team_id, season, timeout=60):
+    """Raw CommonTeamRoster payload for one team and season."""
+    return request_stats('commonteamroster',
+                         {'TeamID': team_id, 'Season': season, 'LeagueID': '00'}, timeout)
+
+
+def league_player_stats_parameters(season, season_type='Regular Season', per_mode='Totals'):
+    """LeagueDashPlayerStats parameters for every player in one season (nba_api defaults)."""
+    parameters = {key: '' for key in (
+        'College', 'Conference', 'Country', 'DateFrom', 'DateTo', 'Division', 'DraftPick',
+        'DraftYear', 'GameScope', 'GameSegment', 'Height', 'Location', 'Outcome', 'PORound',
+        'PlayerExperience', 'PlayerPosition', 'SeasonSegment', 'ShotClockRange', 'StarterBench',
+        'TeamID', 'TwoWay', 'VsConference', 'VsDivision', 'Weight')}
+    parameters.update({
+        'LastNGames': '0', 'MeasureType': 'Base', 'Month': '0', 'OpponentTeamID': 0,
+        'PaceAdjust': 'N', 'PerMode': per_mode, 'Period': '0', 'PlusMinus': 'N', 'Rank': 'N',
+        'Season': season, 'SeasonType': season_type, 'LeagueID': '00',
+    })
+    return parameters
+
+
+def request_league_player_stats(season, season_type='Regular Season', timeout=60):
+    """Raw LeagueDashPlayerStats payload: one season line for every player."""
+    return request_stats('leaguedashplayerstats',
+                         league_player_stats_parameters(season, season_type), timeout)
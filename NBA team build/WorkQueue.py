@@ -0,0 +1,171 @@
+import os
+import time
+from RetryPolicy import Backoff
+
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+FAILED = 'failed'
+DONE = 'done'
+DEAD = 'dead'
+
+UNFINISHED = (PENDING, IN_FLIGHT, FAILED)
+
+JOB_UPSERT = '''
+    INSERT INTO PlayerJobs (player_id, state, attempts, next_retry_at, last_error, updated_at)
+    VALUES (?,?,?,?,?,?)
+    ON CONFLICT(player_id) DO UPDATE SET
+        state = excluded.state, attempts = excluded.attempts,
+        next_retry_at = excluded.next_retry_at, last_error = excluded.last_error,
+        updated_at = excluded.updated_at
+'''
+
+
+class WorkQueue:
+    """Durable per-player job table (PlayerJobs) for collection runs.
+
+    Jobs move pending -> in_flight -> done, or -> failed (due again at
+    `next_retry_at`) and finally -> dead after `max_attempts` failures.
+    State changes go through `writer` when one is given, so they commit in
+    the same transaction as the player rows they describe.
+    """
+
+    def __init__(self, db, writer=None, max_attempts=5, backoff=None, clock=time.time):
+        self.db = db
+        self.writer = writer
+        self.max_attempts = max_attempts
+        self.backoff = backoff or Backoff(base=30.0, cap=3600.0)
+        self.clock = clock
+
+        self.claimed = {}  # player_id -> attempts so far, for jobs handed out by claim()
+
+    def _write(self, sql, row):
+        if self.writer is not None:
+            self.writer.add(sql, row)
+        else:
+            self.db.execute(sql, row)
+            self.db.commit()
+
+    def _flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    # -----------------------
+    # Setup / resume
+    # -----------------------
+    def recover(self):
+        """Return jobs left in_flight by a crashed run to pending."""
+        with self.db:
+            cursor = self.db.execute(
+                "UPDATE PlayerJobs SET state = ? WHERE state = ?", (PENDING, IN_FLIGHT))
+        return cursor.rowcount
+
+    def enqueue(self, player_ids):
+        """(Re)start a run over `player_ids`: each becomes pending with 0 attempts."""
+        self._flush()
+        now = self.clock()
+        with self.db:
+            self.db.executemany(JOB_UPSERT, ((pid, PENDING, 0, 0, None, now) for pid in player_ids))
+
+    def import_skipped_file(self, path):
+        """Move IDs from a legacy skipped_players.txt into the queue, then delete it.
+
+        They come in as failed jobs due now, so the next run retries them
+        alongside its own work instead of taking them for an interrupted run.
+        """
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as f:
+            ids = [int(line.strip()) for line in f if line.strip().isdigit()]
+        self._flush()
+        now = self.clock()
+        with self.db:
+            self.db.executemany(JOB_UPSERT, ((pid, FAILED, 1, 0, "from " + os.path.basename(path), now)
+                                             for pid in ids))
+        os.remove(path)
+        return len(ids)
+
+    # -----------------------
+    # Claiming / state changes
+    # -----------------------
+    def claim(self, limit):
+        """Mark up to `limit` due jobs in_flight and return their IDs.
+
+        Buffered state changes needn't be flushed first: until they land,
+        those jobs read as in_flight and aren't claimable anyway.
+        """
+        now = self.clock()
+        rows = self.db.execute('''
+            SELECT player_id, attempts FROM PlayerJobs
+            WHERE state = ? OR (state = ? AND next_retry_at <= ?)
+            ORDER BY next_retry_at, player_id
+            LIMIT ?
+        ''', (PENDING, FAILED, now, limit)).fetchall()
+        with self.db:
+            self.db.executemany(
+                "UPDATE PlayerJobs SET state = ?, updated_at = ? WHERE player_id = ?",
+                ((IN_FLIGHT, now, pid) for pid, _ in rows))
+        for pid, attempts in rows:
+            self.claimed[pid] = attempts
+        return [pid for pid, _ in rows]
+
+    def retry_delay(self, attempts):
+        return self.backoff.for_attempt(attempts)
+
+    def mark_done(self, player_id):
+        attempts = self.claimed.pop(player_id, 0) + 1
+        self._write(JOB_UPSERT, (player_id, DONE, attempts, 0, None, self.clock()))
+
+    def mark_failed(self, player_id, error=None):
+        """Record a failed attempt; the job goes dead once it hits max_attempts."""
+        attempts = self.claimed.pop(player_id, 0) + 1
+        now = self.clock()
+        if attempts >= self.max_attempts:
+            row = (player_id, DEAD, attempts, 0, error, now)
+        else:
+            row = (player_id, FAILED, attempts, now + self.retry_delay(attempts), error, now)
+        self._write(JOB_UPSERT, row)
+
+    def release(self, player_id):
+        """Hand a claimed job back untouched, e.g. when the run's time budget ran out."""
+        attempts = self.claimed.pop(player_id, 0)
+        self._write(JOB_UPSERT, (player_id, PENDING, attempts, 0, None, self.clock()))
+
+    def mark_dead(self, player_id, error=None):
+        attempts = self.claimed.pop(player_id, 0) + 1
+        self._write(JOB_UPSERT, (player_id, DEAD, attempts, 0, error, self.clock()))
+
+    # -----------------------
+    # Queries
+    # -----------------------
+    def count(self, *states):
+        self._flush()
+        states = states or UNFINISHED
+        marks = ",".join("?" * len(states))
+        return self.db.execute(
+            f"SELECT COUNT(*) FROM PlayerJobs WHERE state IN ({marks})", states).fetchone()[0]
+
+    def ids(self, *states):
+        self._flush()
+        states = states or UNFINISHED
+        marks = ",".join("?" * len(states))
+        return [row[0] for row in self.db.execute(
+            f"SELECT player_id FROM PlayerJobs WHERE state IN ({marks}) ORDER BY player_id", states)]
+
+    def dead_since(self, since):
+        """(jobs that used up max_attempts, jobs that failed permanently) among
+        those that went dead at or after `since` (a `clock` time)."""
+        self._flush()
+        exhausted, permanent = self.db.execute(
+            "SELECT SUM(attempts >= ?), SUM(attempts < ?) FROM PlayerJobs WHERE state = ? AND updated_at >= ?",
+            (self.max_attempts, self.max_attempts, DEAD, since)).fetchone()
+        return exhausted or 0, permanent or 0
+
+    def seconds_until_next_due(self):
+        """0 if work is due now, the wait for the next failed job, or None when nothing is left."""
+        if self.count(PENDING):
+            return 0.0
+        next_due = self.db.execute(
+            "SELECT MIN(next_retry_at) FROM PlayerJobs WHERE state = ?", (FAILED,)).fetchone()[0]
+        if next_due is None:
+            return None
+        return max(0.0, next_due - self.clock())
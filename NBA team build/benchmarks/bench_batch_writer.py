@@ -0,0 +1,75 @@
+"""Rows/sec for the old per-row insert path vs. BatchWriter upserts.
+
+Run from the project folder:  python benchmarks/bench_batch_writer.py [rows]
+"""
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from BatchWriter import BatchWriter, configure_connection  # noqa: E402
+
+PLAYERS_DDL = '''
+    CREATE TABLE Players (
+        player_id INTEGER PRIMARY KEY, full_name TEXT, jersey_num INTEGER,
+        team_name TEXT, team_ab TEXT, pos TEXT, height TEXT, weight INTEGER,
+        country TEXT, is_active TEXT
+    )
+'''
+INSERT = "INSERT INTO Players VALUES (?,?,?,?,?,?,?,?,?,?)"
+UPSERT = INSERT + " ON CONFLICT(player_id) DO UPDATE SET full_name = excluded.full_name"
+
+
+def make_rows(n):
+    return [(i, f"Player {i}", i % 100, "Lakers", "LAL", "Guard", "6-7", 210, "USA", "Active")
+            for i in range(n)]
+
+
+def legacy_per_row(db, rows):
+    cursor = db.cursor()
+    for row in rows:
+        cursor.execute("SELECT COUNT(*) FROM Players WHERE player_id = ?", (row[0],))
+        if cursor.fetchone()[0] == 0:
+            cursor.execute(INSERT, row)
+            db.commit()
+
+
+def batched(db, rows):
+    writer = BatchWriter(db, batch_size=500)
+    for row in rows:
+        writer.add(UPSERT, row)
+    writer.flush()
+
+
+def run(label, func, rows, **pragmas):
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        db = sqlite3.connect(path)
+        configure_connection(db, **pragmas)
+        db.execute(PLAYERS_DDL)
+        db.commit()
+        start = time.perf_counter()
+        func(db, rows)
+        elapsed = time.perf_counter() - start
+        db.close()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    print(f"{label:<32} {len(rows) / elapsed:>12,.0f} rows/sec  ({elapsed:.3f}s)")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows = make_rows(n)
+    print(f"Writing {n} player rows to a file-backed DB")
+    run("per-row SELECT+INSERT+commit", legacy_per_row, rows)
+    run("BatchWriter upsert", batched, rows)
+    run("BatchWriter upsert, WAL+NORMAL", batched, rows, wal=True, synchronous="NORMAL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""End-to-end ingestion benchmark against the local stub stats server.
+
+Runs NBADataCollector.collect_data, then a PlayerCollectionRetry pass, with
+nba_api's HTTP layer pointed at benchmarks/stub_stats_server.py. Nothing
+touches stats.nba.com. Example:
+
+  python benchmarks/bench_ingestion.py --players 2000 --workers 8 --rate 0 \\
+      --latency 0.05 --error-rate 0.02 --throttle-rps 100
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from nba_api.stats.library.http import NBAStatsHTTP  # noqa: E402
+from stub_stats_server import StubData, StubStatsServer  # noqa: E402
+from NBADataCollector import NBADataCollector  # noqa: E402
+from PlayerCollectionRetry import PlayerCollectionRetry  # noqa: E402
+from RetryPolicy import RetryPolicy, Backoff, CircuitBreaker  # noqa: E402
+from WorkQueue import DEAD  # noqa: E402
+
+
+def fetch_json(url):
+    with urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def make_collector(db_path, server, args):
+    policy = RetryPolicy(backoff=Backoff(base=0.05, cap=1.0),
+                         breaker=CircuitBreaker(cooldown=1.0, max_cooldown=5.0))
+    collector = NBADataCollector(db_path, skipped_file=db_path + ".skipped",
+                                 workers=args.workers, requests_per_second=args.rate,
+                                 retry_policy=policy)
+    collector.queue.backoff = Backoff(base=0.1, cap=2.0)
+    # Static lists come from the stub too, so the run is self-contained
+    collector.get_all_players_api = lambda: fetch_json(server.url + "/static/players")
+    collector.get_all_teams_api = lambda: fetch_json(server.url + "/static/teams")
+    return collector
+
+
+def report(label, elapsed, players, server, before, writer):
+    requests = server.counts['requests'] - before['requests']
+    throttled = server.counts['throttled'] - before['throttled']
+    errors = server.counts['errors'] - before['errors']
+    print(f"\n== {label} ==")
+    print(f"players stored   {players:>10,}  in {elapsed:.2f}s  -> {players / elapsed:,.1f} players/sec")
+    connections = server.counts['connections'] - before['connections']
+    print(f"stats requests   {requests:>10,}  (retries {max(0, requests - players):,}, "
+          f"429s {throttled:,}, 500s {errors:,})")
+    print(f"TCP connections  {connections:>10,}  -> {requests / max(connections, 1):,.1f} requests per connection")
+    if writer.flush_seconds:
+        print(f"DB writes        {writer.rows_written:>10,} rows  -> "
+              f"{writer.rows_written / writer.flush_seconds:,.0f} rows/sec while flushing")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion against a local stub server.")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=0, help="client requests/sec limit, 0 = none")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rps", type=float)
+    parser.add_argument("--retry-players", type=int, default=200,
+                        help="players to push through PlayerCollectionRetry afterwards")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--metrics-json", help="write the collector's JSON run report here")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+
+    server = StubStatsServer(data=StubData(args.players), latency=args.latency,
+                             error_rate=args.error_rate, throttle_rps=args.throttle_rps).start()
+    NBAStatsHTTP.base_url = server.url + "/stats/{endpoint}"
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        collector = make_collector(db_path, server, args)
+
+        before = dict(server.counts)
+        start = time.perf_counter()
+        collector.collect_data(resume=False)
+        elapsed = time.perf_counter() - start
+        stored = collector.cursor.execute("SELECT COUNT(*) FROM Players").fetchone()[0]
+        report(f"NBADataCollector.collect_data ({args.workers} workers)", elapsed, stored,
+               server, before, collector.writer)
+        print(f"dead jobs        {collector.queue.count(DEAD):>10,}")
+        print(collector.metrics.summary())
+
+        # PlayerCollectionRetry pass over a slice of the roster
+        retry_ids = list(collector.roster)[:args.retry_players]
+        collector.queue.enqueue(retry_ids)
+        retry = PlayerCollectionRetry(collector.queue, collector.retry_policy, collector.roster,
+                                      collector.sessions)
+        rows_before = collector.writer.rows_written
+
+        def fetch_func(pid):
+            row = collector.fetch_player(pid)
+            if row:
+                collector.add_player_to_db(*row)
+            return row
+
+        before = dict(server.counts)
+        start = time.perf_counter()
+        retry.run_until_empty(fetch_func)
+        collector.writer.flush()
+        elapsed = time.perf_counter() - start
+        report("PlayerCollectionRetry.run_until_empty (1 worker)", elapsed,
+               len(retry_ids) - collector.queue.count(DEAD), server, before, collector.writer)
+        print(f"rows written     {collector.writer.rows_written - rows_before:>10,}")
+        print(f"breaker trips    {collector.retry_policy.breaker.trips:>10,}")
+        collector.write_metrics(args.metrics_json)
+        collector.close()
+    finally:
+        server.shutdown()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+
+if __name__ == "__main__":
+    main()
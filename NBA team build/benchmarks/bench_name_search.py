@@ -0,0 +1,123 @@
+"""Search-as-you-type: per-keystroke filter cost, searching from scratch vs. narrowing.
+
+Run from the project folder:  python benchmarks/bench_name_search.py
+Builds a synthetic Players table, then types a few names one character at a
+time and times FacetIndex.filter, the pass PlayerDisplayApp runs per change
+(name search, facet ANDs, ranking and facet counts). One- and two-letter
+queries, the first ones typed and the ones matching the most names, are
+timed on their own as the worst case for NameIndex.search.
+"""
+import os
+import sys
+import time
+import random
+import sqlite3
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from DatabaseSchema import migrate  # noqa: E402
+from FacetIndex import FacetIndex  # noqa: E402
+from PlayerInfoParser import fold_name, typed_player_columns  # noqa: E402
+
+SYLLABLES = ["ja", "mes", "ni", "ko", "la", "jo", "kić", "lu", "ka", "don", "čić", "gi", "an", "nis",
+             "ste", "phen", "ke", "vin", "dra", "žen", "jo", "sé", "ty", "rese", "sha", "i", "mal",
+             "ro", "bin", "son", "der", "wil", "li", "ams", "tow", "ns", "mur", "ray", "o'", "ne", "al"]
+TEAMS = [("LAL", "Lakers"), ("DEN", "Nuggets"), ("BOS", "Celtics"), ("DAL", "Mavericks"), ("", "")]
+# Real names typed one character at a time, some with a typo
+TYPED = ["nikola jokic", "giannis antetokounpo", "jokc", "lebron jam"]
+REAL = ["Nikola Jokić", "Giannis Antetokounmpo", "LeBron James", "Luka Dončić"]
+SHORT = ["a", "e", "s", "j", "an", "er", "jo"]
+
+
+def make_name(rng):
+    def word():
+        return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{word()} {word()}"
+
+
+def make_db(n):
+    rng = random.Random(7)
+    db = sqlite3.connect(":memory:")
+    migrate(db)
+    db.executemany("INSERT INTO Teams (team_id, team_ab, team_nickname) VALUES (?,?,?)",
+                   [(i, ab, nick) for i, (ab, nick) in enumerate(TEAMS) if ab])
+    rows = []
+    for pid in range(1, n + 1):
+        name = REAL[pid % len(REAL)] if pid % 1000 == 0 else make_name(rng)
+        team_ab, nickname = rng.choice(TEAMS)
+        pos = rng.choice(["Guard", "Forward", "Center", "Guard-Forward", "Forward-Center"])
+        active = "Active" if rng.random() < 0.1 else "Inactive"
+        rows.append((pid, name, 0, nickname, team_ab, pos, "6-6", 220, rng.choice(["USA", "Serbia", "Canada"]),
+                     active, *typed_player_columns(0, pos, "6-6", 220, active), fold_name(name)))
+    db.executemany(f"INSERT INTO Players (player_id, full_name, jersey_num, team_name, team_ab, pos, height, "
+                   f"weight, country, is_active, height_in, weight_lbs, jersey, active, pos_mask, name_folded) "
+                   f"VALUES ({','.join('?' * 16)})", rows)
+    return db
+
+
+def event_loop_stall(facets, filters):
+    """Longest gap a 1 ms timer loop (standing in for Tk's) sees while a worker
+    thread types every name from scratch, as PlayerDisplayApp runs the pass."""
+    def typing():
+        for word in TYPED:
+            for end in range(1, len(word) + 1):
+                facets.filter(word[:end], None, **filters)
+
+    worker = threading.Thread(target=typing)
+    worker.start()
+    stall = 0.0
+    while worker.is_alive():
+        start = time.perf_counter()
+        time.sleep(0.001)
+        stall = max(stall, time.perf_counter() - start)
+    return stall
+
+
+def short_search(facets, repeat=20):
+    """Worst median NameIndex.search time over SHORT, and the query behind it."""
+    worst = (0.0, None)
+    for query in SHORT:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            facets.name_index.search(query)
+            times.append(time.perf_counter() - start)
+        worst = max(worst, (sorted(times)[repeat // 2], query))
+    return worst
+
+
+def bench(n):
+    db = make_db(n)
+    start = time.perf_counter()
+    facets = FacetIndex.from_db(db)
+    build = time.perf_counter() - start
+    filters = dict(team="All", position="Guard", country="All", active_only=False)
+
+    timings = {"scratch": [], "narrowing": []}
+    for word in TYPED:
+        previous = None
+        for end in range(1, len(word) + 1):
+            prefix = word[:end]
+            start = time.perf_counter()
+            facets.filter(prefix, None, **filters)
+            timings["scratch"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            previous = (facets.filter(prefix, previous, **filters)[1] or None) if len(prefix) >= 3 else None
+            timings["narrowing"].append(time.perf_counter() - start)
+
+    line = f"{n:>8,} players | index build {build:6.2f}s"
+    for label, values in timings.items():
+        line += (f" | {label} mean {sum(values) / len(values) * 1000:6.2f} ms, "
+                 f"max {max(values) * 1000:6.2f} ms")
+    seconds, query = short_search(facets)
+    line += f" | short search worst {seconds * 1000:5.2f} ms ({query!r})"
+    print(line + f" | event loop stall {event_loop_stall(facets, filters) * 1000:5.1f} ms")
+
+
+def main():
+    for n in (5_000, 100_000):
+        bench(n)
+
+
+if __name__ == "__main__":
+    main()
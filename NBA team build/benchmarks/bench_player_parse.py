@@ -0,0 +1,70 @@
+"""Per-player CPU cost: DataFrame parse vs. the plain PlayerInfoParser path.
+
+Run from the project folder:  python benchmarks/bench_player_parse.py [players]
+The DataFrame column is skipped when pandas isn't installed.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from PlayerInfoParser import PLAYER_FIELDS, parse_player_info  # noqa: E402
+
+HEADERS = [
+    "PERSON_ID", "FIRST_NAME", "LAST_NAME", "DISPLAY_FIRST_LAST", "DISPLAY_LAST_COMMA_FIRST",
+    "DISPLAY_FI_LAST", "PLAYER_SLUG", "BIRTHDATE", "SCHOOL", "COUNTRY", "LAST_AFFILIATION",
+    "HEIGHT", "WEIGHT", "SEASON_EXP", "JERSEY", "POSITION", "ROSTERSTATUS", "TEAM_ID",
+    "TEAM_NAME", "TEAM_ABBREVIATION", "TEAM_CODE", "TEAM_CITY", "PLAYERCODE", "FROM_YEAR",
+    "TO_YEAR", "DLEAGUE_FLAG", "NBA_FLAG", "GAMES_PLAYED_FLAG", "DRAFT_YEAR", "DRAFT_ROUND",
+    "DRAFT_NUMBER",
+]
+
+
+def make_payload(player_id):
+    row = [player_id, "Lebron", "James", "LeBron James", "James, LeBron", "L. James",
+           "lebron-james", "1984-12-30T00:00:00", "St. Vincent-St. Mary HS (OH)", "USA",
+           "St. Vincent-St. Mary HS (OH)/USA", "6-9", "250", 21, "23", "Forward", "Active",
+           1610612747, "Lakers", "LAL", "lakers", "Los Angeles", "lebron_james", 2003, 2024,
+           "N", "Y", "Y", "2003", "1", "1"]
+    return {"resultSets": [
+        {"name": "CommonPlayerInfo", "headers": HEADERS, "rowSet": [row]},
+        {"name": "PlayerHeadlineStats",
+         "headers": ["PLAYER_ID", "PLAYER_NAME", "TimeFrame", "PTS", "AST", "REB", "PIE"],
+         "rowSet": [[player_id, "LeBron James", "2024-25", 24.4, 8.2, 7.8, 0.16]]},
+        {"name": "AvailableSeasons", "headers": ["SEASON_ID"],
+         "rowSet": [[f"2{year}"] for year in range(2003, 2025)]},
+    ]}
+
+
+def parse_with_dataframe(payload, DataFrame):
+    rs = next(r for r in payload["resultSets"] if r["name"] == "CommonPlayerInfo")
+    df = DataFrame(rs["rowSet"], columns=rs["headers"])
+    return {key: df.at[0, field] for field, key in PLAYER_FIELDS.items()}
+
+
+def bench(label, func, payloads):
+    start = time.process_time()
+    for payload in payloads:
+        func(payload)
+    per_player = (time.process_time() - start) / len(payloads)
+    print(f"{label:<22} {per_player * 1e6:>10.1f} us CPU/player, "
+          f"{per_player * 5000:.3f}s per 5,000 players")
+    return per_player
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    payloads = [make_payload(i) for i in range(n)]
+
+    fast = bench("PlayerInfoParser", parse_player_info, payloads)
+    try:
+        from pandas import DataFrame
+    except ImportError:
+        print("pandas not installed; skipping the DataFrame path")
+        return
+    slow = bench("DataFrame + df.at", lambda p: parse_with_dataframe(p, DataFrame), payloads)
+    print(f"speedup: {slow / fast:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Active-status lookup: linear scan over player_table vs. RosterIndex.
+
+Run from the project folder:  python benchmarks/bench_roster_index.py
+The scan is timed on a sample of lookups and extrapolated to a full run,
+since scanning every ID at 50k players takes minutes.
+"""
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from RosterIndex import RosterIndex  # noqa: E402
+
+SAMPLE = 500
+
+
+def make_static_players(n):
+    return [{'id': i, 'full_name': f"Player {i}", 'is_active': i % 10 == 0} for i in range(n)]
+
+
+def bench(n):
+    static_players = make_static_players(n)
+    sample = random.sample(range(n), SAMPLE)
+
+    # Old path: player_table list + scan per player
+    player_table = [[p['id'], 'Active' if p['is_active'] else 'Not Active'] for p in static_players]
+    start = time.perf_counter()
+    for pid in sample:
+        next(iter([p[1] for p in player_table if p[0] == pid]), "Unknown")
+    scan_per_lookup = (time.perf_counter() - start) / SAMPLE
+
+    # New path: build the index once, then O(1) lookups for every player
+    start = time.perf_counter()
+    roster = RosterIndex.from_static(static_players)
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    for pid in range(n):
+        roster.status(pid)
+    index_per_lookup = (time.perf_counter() - start) / n
+
+    print(f"{n:>7,} players | scan {scan_per_lookup * 1e6:>10.1f} us/lookup, "
+          f"~{scan_per_lookup * n:>8.2f}s per run | index {index_per_lookup * 1e6:.3f} us/lookup, "
+          f"{build + index_per_lookup * n:.4f}s per run incl. build")
+
+
+def main():
+    for n in (5_000, 50_000):
+        bench(n)
+
+
+if __name__ == "__main__":
+    main()
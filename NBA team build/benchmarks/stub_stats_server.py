@@ -0,0 +1,262 @@
+"""Local stand-in for the stats.nba.com endpoints the collector uses.
+
+Serves:
+  /stats/commonplayerinfo?PlayerID=N   CommonPlayerInfo payload
+  /stats/commonteamroster?TeamID=N     CommonTeamRoster payload
+  /stats/leaguedashplayerstats         LeagueDashPlayerStats payload (every player)
+  /static/players                      players.get_players() style list
+  /static/teams                        teams.get_teams() style list
+
+Latency, error rate and throttling are configurable, so ingestion runs can be
+measured offline. Run standalone with
+  python benchmarks/stub_stats_server.py --port 8765 --players 5000
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PLAYER_HEADERS = [
+    "PERSON_ID", "FIRST_NAME", "LAST_NAME", "DISPLAY_FIRST_LAST", "DISPLAY_LAST_COMMA_FIRST",
+    "DISPLAY_FI_LAST", "PLAYER_SLUG", "BIRTHDATE", "SCHOOL", "COUNTRY", "LAST_AFFILIATION",
+    "HEIGHT", "WEIGHT", "SEASON_EXP", "JERSEY", "POSITION", "ROSTERSTATUS", "TEAM_ID",
+    "TEAM_NAME", "TEAM_ABBREVIATION", "TEAM_CODE", "TEAM_CITY", "PLAYERCODE", "FROM_YEAR",
+    "TO_YEAR", "DLEAGUE_FLAG", "NBA_FLAG", "GAMES_PLAYED_FLAG", "DRAFT_YEAR", "DRAFT_ROUND",
+    "DRAFT_NUMBER",
+]
+HEADLINE_HEADERS = ["PLAYER_ID", "PLAYER_NAME", "TimeFrame", "PTS", "AST", "REB", "PIE"]
+ROSTER_HEADERS = [
+    "TeamID", "SEASON", "LeagueID", "PLAYER", "NICKNAME", "PLAYER_SLUG", "NUM", "POSITION",
+    "HEIGHT", "WEIGHT", "BIRTH_DATE", "AGE", "EXP", "SCHOOL", "PLAYER_ID", "HOW_ACQUIRED",
+]
+LEAGUE_DASH_HEADERS = [
+    "PLAYER_ID", "PLAYER_NAME", "NICKNAME", "TEAM_ID", "TEAM_ABBREVIATION", "AGE", "GP", "W",
+    "L", "W_PCT", "MIN", "FGM", "FGA", "FG_PCT", "FG3M", "FG3A", "FG3_PCT", "FTM", "FTA",
+    "FT_PCT", "OREB", "DREB", "REB", "AST", "TOV", "STL", "BLK", "BLKA", "PF", "PFD", "PTS",
+    "PLUS_MINUS",
+]
+ROSTER_POSITIONS = {"Guard": "G", "Forward": "F", "Center": "C", "Guard-Forward": "G-F",
+                    "Forward-Center": "F-C"}
+POSITIONS = ["Guard", "Forward", "Center", "Guard-Forward", "Forward-Center", ""]
+COUNTRIES = ["USA", "USA", "USA", "Canada", "France", "Serbia", "Australia", "Spain"]
+
+
+class StubData:
+    """Deterministic fake league: `n_players` players spread over 30 teams."""
+
+    def __init__(self, n_players=5000, active_ratio=0.1, seed=1):
+        rng = random.Random(seed)
+        self.teams = [{
+            'id': 1610612737 + i, 'full_name': f"Stub City {i} Team {i}", 'abbreviation': f"T{i:02d}",
+            'nickname': f"Team {i}", 'city': f"Stub City {i}", 'state': "Stub State",
+            'year_founded': 1946 + i,
+        } for i in range(30)]
+        self.players = []
+        self.details = {}
+        for pid in range(1, n_players + 1):
+            active = rng.random() < active_ratio
+            first, last = f"First{pid}", f"Last{pid}"
+            team = rng.choice(self.teams) if active or rng.random() < 0.5 else None
+            self.players.append({'id': pid, 'full_name': f"{first} {last}", 'first_name': first,
+                                 'last_name': last, 'is_active': active})
+            self.details[pid] = {
+                'first': first, 'last': last, 'active': active, 'team': team,
+                'height': f"{rng.randint(5, 7)}-{rng.randint(0, 11)}",
+                'weight': str(rng.randint(160, 290)), 'jersey': str(rng.randint(0, 99)),
+                'position': rng.choice(POSITIONS), 'country': rng.choice(COUNTRIES),
+                'from_year': rng.randint(1947, 2024),
+            }
+
+    def player_info(self, pid):
+        d = self.details[pid]
+        team = d['team'] or {'id': 0, 'nickname': '', 'abbreviation': '', 'city': ''}
+        row = [pid, d['first'], d['last'], f"{d['first']} {d['last']}", f"{d['last']}, {d['first']}",
+               f"{d['first'][0]}. {d['last']}", f"{d['first']}-{d['last']}".lower(),
+               "1990-01-01T00:00:00", "Stub University", d['country'], "Stub University/USA",
+               d['height'], d['weight'], 5, d['jersey'], d['position'],
+               "Active" if d['active'] else "Inactive", team['id'], team['nickname'],
+               team['abbreviation'], team['nickname'].lower(), team['city'],
+               f"{d['first']}_{d['last']}".lower(), d['from_year'], d['from_year'] + 5,
+               "N", "Y", "Y", str(d['from_year'] - 1), "1", str(pid % 60 + 1)]
+        return {"resource": "commonplayerinfo", "parameters": {"PlayerID": pid}, "resultSets": [
+            {"name": "CommonPlayerInfo", "headers": PLAYER_HEADERS, "rowSet": [row]},
+            {"name": "PlayerHeadlineStats", "headers": HEADLINE_HEADERS,
+             "rowSet": [[pid, row[3], "2024-25", 12.5, 3.1, 4.2, 0.1]] if d['active'] else []},
+            {"name": "AvailableSeasons", "headers": ["SEASON_ID"], "rowSet": [["22024"]]},
+        ]}
+
+    def team_roster(self, team_id):
+        rows = []
+        for pid, d in self.details.items():
+            if d['active'] and d['team'] and d['team']['id'] == team_id:
+                rows.append([team_id, "2024", "00", f"{d['first']} {d['last']}", d['first'],
+                             f"{d['first']}-{d['last']}".lower(), d['jersey'],
+                             ROSTER_POSITIONS.get(d['position'], d['position']),
+                             d['height'], d['weight'], "JAN 01, 1990", 34.0, "5",
+                             "Stub University", pid, ""])
+        return {"resource": "commonteamroster", "parameters": {"TeamID": team_id}, "resultSets": [
+            {"name": "CommonTeamRoster", "headers": ROSTER_HEADERS, "rowSet": rows},
+            {"name": "Coaches", "headers": ["TEAM_ID"], "rowSet": []},
+        ]}
+
+    def league_player_stats(self, season):
+        rng = random.Random(season)
+        rows = []
+        for pid, d in self.details.items():
+            if not d['active']:
+                continue
+            gp = rng.randint(1, 82)
+            w = rng.randint(0, gp)
+            fga, fg3a, fta = rng.randint(0, 20 * gp), rng.randint(0, 8 * gp), rng.randint(0, 8 * gp)
+            fgm, fg3m, ftm = fga // 2, fg3a // 3, fta * 3 // 4
+            oreb, dreb = rng.randint(0, 3 * gp), rng.randint(0, 7 * gp)
+            pts = 2 * fgm + fg3m + ftm
+            rows.append([pid, f"{d['first']} {d['last']}", d['first'], d['team']['id'],
+                         d['team']['abbreviation'], 27.0, gp, w, gp - w, round(w / gp, 3),
+                         round(gp * rng.uniform(5, 38), 1), fgm, fga, round(fgm / fga, 3) if fga else 0,
+                         fg3m, fg3a, round(fg3m / fg3a, 3) if fg3a else 0, ftm, fta,
+                         round(ftm / fta, 3) if fta else 0, oreb, dreb, oreb + dreb,
+                         rng.randint(0, 6 * gp), rng.randint(0, 3 * gp), rng.randint(0, 2 * gp),
+                         rng.randint(0, 2 * gp), rng.randint(0, gp), rng.randint(0, 3 * gp),
+                         rng.randint(0, 3 * gp), pts, rng.randint(-300, 300)])
+        return {"resource": "leaguedashplayerstats", "parameters": {"Season": season}, "resultSets": [
+            {"name": "LeagueDashPlayerStats", "headers": LEAGUE_DASH_HEADERS, "rowSet": rows},
+        ]}
+
+
+class StubStatsServer(ThreadingHTTPServer):
+    """HTTP server with knobs for latency, random 500s and 429 throttling.
+
+    `throttle_rps` answers 429 once more than that many stats requests arrived
+    in the last second.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, data=None, latency=0.05, jitter=0.02, error_rate=0.0,
+                 throttle_rps=None, seed=1):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.data = data or StubData()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rps = throttle_rps
+        self.rng = random.Random(seed)
+
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.counts = {'requests': 0, 'ok': 0, 'errors': 0, 'throttled': 0, 'not_found': 0,
+                       'connections': 0}
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def admit(self):
+        """Decide the fate of one stats request: 'ok', 'error' or 'throttled'."""
+        now = time.monotonic()
+        with self.lock:
+            self.counts['requests'] += 1
+            if self.throttle_rps:
+                while self.recent and now - self.recent[0] > 1.0:
+                    self.recent.popleft()
+                if len(self.recent) >= self.throttle_rps:
+                    return 'throttled'
+                self.recent.append(now)
+            if self.rng.random() < self.error_rate:
+                return 'error'
+            delay = max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        return 'ok'
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')  # one handler per TCP connection
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = {k.lower(): v[0] for k, v in parse_qs(url.query).items()}
+
+        if url.path == "/static/players":
+            return self._send_json(200, server.data.players)
+        if url.path == "/static/teams":
+            return self._send_json(200, server.data.teams)
+        if not url.path.startswith("/stats/"):
+            server.count('not_found')
+            return self._send_json(404, {"error": "unknown path"})
+
+        fate = server.admit()
+        if fate == 'throttled':
+            server.count('throttled')
+            return self._send_json(429, {"error": "Too Many Requests"})
+        if fate == 'error':
+            server.count('errors')
+            return self._send_json(500, {"error": "Internal Server Error"})
+
+        endpoint = url.path[len("/stats/"):].lower()
+        try:
+            if endpoint == "commonplayerinfo":
+                body = server.data.player_info(int(params["playerid"]))
+            elif endpoint == "commonteamroster":
+                body = server.data.team_roster(int(params["teamid"]))
+            elif endpoint == "leaguedashplayerstats":
+                body = server.data.league_player_stats(params["season"])
+            else:
+                raise KeyError(endpoint)
+        except (KeyError, ValueError):
+            server.count('not_found')
+            return self._send_json(400, {"error": "bad request"})
+        server.count('ok')
+        self._send_json(200, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake stats.nba.com responses locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rps", type=float)
+    args = parser.parse_args()
+
+    server = StubStatsServer(args.port, StubData(args.players), latency=args.latency,
+                             error_rate=args.error_rate, throttle_rps=args.throttle_rps)
+    print(f"Stub stats server on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()